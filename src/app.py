@@ -1,10 +1,9 @@
 import streamlit as st
 
-from components.user import get_user_info, UserInfo
+from components.user import get_user_info, remember_user_info
+from components.infra import backend
+from components.infra.backend.models import CreateUser, UpdateUser
 
-from utils.network import get_httpx_client
-
-from settings import get_settings
 import logfire
 
 logfire.configure()
@@ -13,35 +12,30 @@ logfire.configure()
 def login():
     user_info = get_user_info()
     if not user_info:
-        with get_httpx_client() as client:
-            resp = client.post(
-                f"{get_settings().connection.backend_url.unicode_string()}user/v1/create",
-                json={
-                    "name": st.user.get("name"),
-                    "email": st.user.get("email"),
-                    "avatarUrl": st.user.get("picture", ""),
-                    "is_logged_in": True,
-                },
+        user_info = remember_user_info(
+            backend.create_user(
+                CreateUser(
+                    name=str(st.user.get("name")),
+                    email=str(st.user.get("email")),
+                    avatarUrl=str(st.user.get("picture", "")),
+                    is_logged_in=True,
+                )
             )
-            if resp.status_code == 404:
-                raise RuntimeError("Failed to create user")
-
-            user_info = UserInfo.model_validate(resp.json())
+        )
+        assert user_info
 
     if not user_info.is_logged_in:
-        with get_httpx_client() as client:
-            resp = client.post(
-                f"{get_settings().connection.backend_url.unicode_string()}user/v1/update",
-                json={
-                    "id": user_info.id,
-                    "name": user_info.name,
-                    "email": user_info.email,
-                    "avatarUrl": user_info.avatarUrl,
-                    "is_logged_in": True,
-                },
+        remember_user_info(
+            backend.update_user(
+                UpdateUser(
+                    id=user_info.id,
+                    name=user_info.name,
+                    email=user_info.email,
+                    avatarUrl=user_info.avatarUrl,
+                    is_logged_in=True,
+                )
             )
-            if resp.status_code == 404:
-                raise RuntimeError("Failed to update user info")
+        )
 
 
 if not st.user.is_logged_in:
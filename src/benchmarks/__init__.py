@@ -0,0 +1,14 @@
+"""Microbenchmarks of the helpers that run on every rerun or audio frame.
+
+Results are stored as named baselines under ``benchmarks/baselines`` and
+later runs are compared against them. From ``src``::
+
+    python -m benchmarks --save main          # on the main branch
+    python -m benchmarks --compare main       # on a change; exits 1 if slower
+
+New benchmarks are registered in ``cases.py`` with ``@benchmark``.
+"""
+
+from .runner import Result, benchmark, compare, load_baseline, run, save_baseline
+
+__all__ = ["Result", "benchmark", "compare", "load_baseline", "run", "save_baseline"]
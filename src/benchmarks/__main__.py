@@ -0,0 +1,68 @@
+import argparse
+import sys
+import warnings
+
+from streamlit import logger as streamlit_logger
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time the hot helpers and compare against a stored baseline.",
+    )
+    parser.add_argument("-k", dest="select", help="only benchmarks containing this")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks")
+    parser.add_argument("--save", metavar="NAME", help="store results as a baseline")
+    parser.add_argument(
+        "--compare", metavar="NAME", help="compare against a stored baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown that counts as a regression (default 0.1 = 10%%)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per timing round"
+    )
+    args = parser.parse_args()
+
+    # Calling widgets outside `streamlit run` is noisy.
+    streamlit_logger.set_log_level("error")
+    warnings.filterwarnings("ignore", module="pydub")
+
+    from .runner import compare, format_time, get_benchmarks, load_baseline, run
+    from .runner import save_baseline
+
+    if args.list:
+        print("\n".join(get_benchmarks()))
+        return 0
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    results = run(
+        args.select,
+        args.repeat,
+        args.min_time,
+        progress=lambda name, r: print(
+            f"{name:<40}{format_time(r.min):>12}{format_time(r.median):>12}",
+            file=sys.stderr,
+        ),
+    )
+    if args.save:
+        print(f"saved {save_baseline(args.save, results)}", file=sys.stderr)
+    if baseline is None:
+        return 0
+    report, regressions = compare(baseline, results, args.threshold)
+    print(report)
+    if regressions:
+        print(
+            f"\n{len(regressions)} slower than {args.compare}: "
+            + ", ".join(regressions)
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
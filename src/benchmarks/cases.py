@@ -0,0 +1,193 @@
+"""The helpers that run on every rerun or every audio frame."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from standin.data import make_lesson
+
+from .runner import benchmark
+
+LESSON_COUNTS = (10, 1_000, 10_000)
+FRAME_ROWS = (1_000, 100_000)
+
+
+def _lesson_frame(rows: int) -> pd.DataFrame:
+    lessons = [make_lesson(i, words=20) for i in range(1, rows + 1)]
+    return pd.DataFrame(
+        {
+            "id": [lesson["id"] for lesson in lessons],
+            "name": [lesson["name"] for lesson in lessons],
+            "description": [lesson["description"] for lesson in lessons],
+            "type": [lesson["type"] for lesson in lessons],
+            "author": [lesson["author"]["name"] for lesson in lessons],
+            "text": [
+                lesson["content"].get("text", lesson["content"].get("topic", ""))
+                for lesson in lessons
+            ],
+        }
+    )
+
+
+def _audio_frame(seed: int = 0):
+    """20 ms of stereo 48 kHz noise, as WebRTC delivers it."""
+    import av
+
+    samples = np.random.default_rng(seed).normal(0, 3000, (1, 960 * 2))
+    frame = av.AudioFrame.from_ndarray(
+        samples.astype(np.int16), format="s16", layout="stereo"
+    )
+    frame.sample_rate = 48_000
+    return frame
+
+
+@benchmark("lesson.validate", LESSON_COUNTS)
+def lesson_validate(count: int):
+    from models.lesson import Lesson
+
+    payload = [make_lesson(i) for i in range(1, count + 1)]
+    return lambda: [Lesson.model_validate(lesson) for lesson in payload]
+
+
+@benchmark("lesson.cache_validate", LESSON_COUNTS)
+def lesson_cache_validate(count: int):
+    """A catalog refresh in which no lesson changed."""
+    from components.infra.backend.lessons import LessonCache
+
+    payload = [make_lesson(i) for i in range(1, count + 1)]
+    cache = LessonCache(count)
+    for lesson in payload:
+        cache.validate(lesson)
+    return lambda: [cache.validate(lesson) for lesson in payload]
+
+
+@benchmark("visualize.filter_dataframe", FRAME_ROWS)
+def filter_dataframe(rows: int):
+    from utils.visualize import filter_dataframe
+
+    df = _lesson_frame(rows)
+    # Outside a script run the widgets return their defaults, so this times
+    # what every rerun pays before any filter applies.
+    return lambda: filter_dataframe(df, {})
+
+
+@benchmark("visualize.apply_filters", FRAME_ROWS)
+def apply_filters(rows: int):
+    from utils.visualize import apply_filters
+
+    df = _lesson_frame(rows).astype(str)
+    filters = {"name": "lesson 1", "type": "read"}
+    return lambda: apply_filters(df, filters)
+
+
+@benchmark("visualize.apply_filters_regex", FRAME_ROWS)
+def apply_filters_regex(rows: int):
+    from utils.visualize import apply_filters
+
+    df = _lesson_frame(rows)
+    filters = {"name": r"lesson 1\d*$", "text": "river|market"}
+    return lambda: apply_filters(df, filters)
+
+
+@benchmark("visualize.apply_filters_cold", FRAME_ROWS)
+def apply_filters_cold(rows: int):
+    """A frame rebuilt on each rerun, without a key: normalized every time."""
+    from utils.visualize import apply_filters
+
+    df = _lesson_frame(rows)
+    filters = {"name": "lesson 1", "text": "river|market"}
+    return lambda: apply_filters(df.copy(deep=False), filters)
+
+
+@benchmark("visualize.apply_filters_keyed", FRAME_ROWS)
+def apply_filters_keyed(rows: int):
+    """A frame rebuilt on each rerun, with a key naming its data."""
+    from utils.visualize import apply_filters
+
+    df = _lesson_frame(rows)
+    filters = {"name": "lesson 1", "text": "river|market"}
+    key = ("benchmarks.apply_filters_keyed", rows)
+    return lambda: apply_filters(df.copy(deep=False), filters, key=key)
+
+
+@benchmark("visualize.split_frame", FRAME_ROWS)
+def split_frame(rows: int):
+    from utils.visualize import split_frame
+
+    df = _lesson_frame(rows)
+    return lambda: split_frame(df, 25)
+
+
+@benchmark("visualize.frame_slice", FRAME_ROWS)
+def frame_slice(rows: int):
+    """The page `paginate_df` shows, in the middle of the frame."""
+    from utils.visualize import frame_slice
+
+    df = _lesson_frame(rows)
+    return lambda: frame_slice(df, rows // 2, 25)
+
+
+@benchmark("validate.normalize_text")
+def normalize_text():
+    from utils.validate import normalize_text
+
+    text = "Bài học Tiếng Việt: Đọc HIỂU " * 10
+    return lambda: normalize_text(text)
+
+
+@benchmark("validate.is_valid_url")
+def is_valid_url():
+    from utils.validate import is_valid_url
+
+    urls = [
+        "https://example.com/lesson/v1/list?page=2",
+        "example.com",
+        "not a url",
+        "http://sub.domain.example.org/path/to/audio.wav",
+    ]
+    return lambda: [is_valid_url(url) for url in urls]
+
+
+@benchmark("exercise.parse_content")
+def parse_content():
+    from components.lessons.exercise import parse_content
+    from models.lesson import Lesson
+
+    lesson = Lesson.model_validate(make_lesson(3))
+    return lambda: parse_content(lesson.content)
+
+
+@benchmark("exercise.get_initial_prompt")
+def get_initial_prompt():
+    from components.lessons.exercise import get_initial_prompt
+    from models.lesson import Lesson
+
+    lesson = Lesson.model_validate(make_lesson(3))
+    return lambda: get_initial_prompt(lesson)
+
+
+@benchmark("audio.frame_energy")
+def frame_energy():
+    from utils.audio import frame_energy
+
+    frame = _audio_frame()
+    return lambda: frame_energy(frame)
+
+
+@benchmark("audio.add_frame_to_chunk")
+def add_frame_to_chunk():
+    """One second of frames appended to a growing chunk."""
+    import pydub
+
+    from utils.audio import add_frame_to_chunk
+
+    frames = [_audio_frame(seed) for seed in range(50)]
+
+    def run():
+        chunk = pydub.AudioSegment.empty()
+        for frame in frames:
+            chunk = add_frame_to_chunk(chunk, frame)
+        return chunk
+
+    return run
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+import json
+from pathlib import Path
+import platform
+import statistics
+import timeit
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+Setup = Callable[..., Callable[[], object]]
+
+_registry: dict[str, tuple[Setup, tuple]] = {}
+
+
+def benchmark(name: str, params: Iterable[object] = ()):
+    """Register a benchmark.
+
+    The decorated function does the setup (building inputs) and returns the
+    callable to time. With `params`, one benchmark is registered per value,
+    named `name[value]`, and the value is passed to the setup function.
+    """
+
+    def decorator(setup: Setup) -> Setup:
+        values = list(params)
+        if not values:
+            _registry[name] = (setup, ())
+        for value in values:
+            _registry[f"{name}[{value}]"] = (setup, (value,))
+        return setup
+
+    return decorator
+
+
+def get_benchmarks() -> dict[str, tuple[Setup, tuple]]:
+    from . import cases  # noqa: F401  registers the benchmarks
+
+    return dict(_registry)
+
+
+@dataclass(slots=True)
+class Result:
+    """Seconds per call: the best and the median of `repeat` rounds of
+    `number` calls each."""
+
+    min: float
+    median: float
+    number: int
+    repeat: int
+
+
+def measure(fn: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> Result:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, round(number * min_time / 0.2))
+    rounds = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return Result(min(rounds), statistics.median(rounds), number, repeat)
+
+
+def run(
+    select: str | None = None,
+    repeat: int = 5,
+    min_time: float = 0.2,
+    progress: Callable[[str, Result], None] | None = None,
+) -> dict[str, Result]:
+    """Run the benchmarks whose name contains `select` (all by default)."""
+    results = {}
+    for name, (setup, args) in get_benchmarks().items():
+        if select and select not in name:
+            continue
+        results[name] = measure(setup(*args), repeat, min_time)
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def save_baseline(name: str, results: dict[str, Result]) -> Path:
+    """Store results as a named baseline, merged into an existing one."""
+    path = BASELINE_DIR / f"{name}.json"
+    stored = load_baseline(name) if path.exists() else {}
+    stored.update(results)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "processor": platform.processor(),
+                "results": {k: asdict(v) for k, v in sorted(stored.items())},
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    return path
+
+
+def load_baseline(name: str) -> dict[str, Result]:
+    path = BASELINE_DIR / f"{name}.json"
+    data = json.loads(path.read_text())
+    return {k: Result(**v) for k, v in data["results"].items()}
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def compare(
+    baseline: dict[str, Result], results: dict[str, Result], threshold: float = 0.1
+) -> tuple[str, list[str]]:
+    """Compare best times against a baseline.
+
+    Returns:
+        tuple[str, list[str]]: the report, and the benchmarks that got slower
+        by more than `threshold` (a fraction).
+    """
+    width = max(map(len, results), default=10) + 2
+    lines = [f"{'benchmark':<{width}}{'baseline':>12}{'current':>12}{'change':>9}"]
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            lines.append(
+                f"{name:<{width}}{'-':>12}{format_time(result.min):>12}{'new':>9}"
+            )
+            continue
+        change = result.min / before.min - 1
+        verdict = ""
+        if change > threshold:
+            verdict = "  slower"
+            regressions.append(name)
+        elif change < -threshold:
+            verdict = "  faster"
+        lines.append(
+            f"{name:<{width}}{format_time(before.min):>12}"
+            f"{format_time(result.min):>12}{change:>+9.1%}{verdict}"
+        )
+    return "\n".join(lines), regressions
@@ -2,23 +2,21 @@ from __future__ import annotations
 
 from typing import cast
 import uuid
-from .user import get_user_info
+from .user import get_user_avatar, get_user_info
+import logfire
 import streamlit as st
-from utils.network import get_httpx_client
-from utils.network import build_url
+from components.infra import backend
 
 
 def get_avatar_url():
-    user_info = get_user_info()
-    if user_info:
-        return user_info.avatarUrl
-    return None
+    return get_user_avatar()
 
 
 def display_chat_history(session_id: str, header: str, history: list[dict[str, str]]):
+    avatar = get_avatar_url()
     for i, h in enumerate(history):
         if h.get("role") == "user":
-            with st.chat_message("User", avatar=get_avatar_url()):
+            with st.chat_message("User", avatar=avatar):
                 st.write(f"{h['content']}")
         elif h.get("role") == "assistant":
             with st.chat_message("assistant"):
@@ -27,21 +25,18 @@ def display_chat_history(session_id: str, header: str, history: list[dict[str, s
 
 def get_assistant_response(session_id: str, message: str):
     user_info = get_user_info()
-    with get_httpx_client() as client:
-        url = build_url("chat/v1/stream")
-        with client.stream(
-            "POST",
-            url,
-            json={
+    try:
+        yield from backend.stream_chat(
+            {
                 "message": message,
                 "conversation_id": session_id,
                 "lang": st.session_state.chat_session["lang"],
                 "user": user_info.name if user_info else "Anonymous",
-            },
-        ) as stream_resp:
-            if stream_resp.status_code == 200:
-                for token in stream_resp.iter_text():
-                    yield token
+            }
+        )
+    except RuntimeError as e:
+        logfire.error("Getting the assistant's response failed", _exc_info=e)
+        yield "Failed to get response"
 
 
 def kickoff_initial_prompt(session_id: str, initial_prompt: str):
@@ -55,7 +50,6 @@ def kickoff_initial_prompt(session_id: str, initial_prompt: str):
     st.session_state.chat_session["history"].append(
         {"role": "assistant", "content": response_text}
     )
-    st.rerun(scope="fragment")
 
 
 def handle_user_input(session_id: str, message: str):
@@ -104,14 +98,17 @@ def display_chat(session_id: str, initial_prompt: str | None = None):
     else:
         message = st.chat_input("Input here")
         with st.container(height=750):
-            if initial_prompt and not st.session_state.chat_session.get(
-                "kickoff_finished"
-            ):
-                kickoff_initial_prompt(session_id, initial_prompt)
             history = cast(
                 list[dict[str, str]], st.session_state.chat_session["history"]
             )
             display_chat_history(session_id, "Chat History", history)
+            # The kickoff answer is shown as it streams and added to the
+            # history after it, so it is not shown twice without a rerun,
+            # which this function cannot scope: it also runs in full reruns.
+            if initial_prompt and not st.session_state.chat_session.get(
+                "kickoff_finished"
+            ):
+                kickoff_initial_prompt(session_id, initial_prompt)
             if message:
                 handle_user_input(session_id, message)
 
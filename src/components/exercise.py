@@ -6,8 +6,7 @@ from .user import get_user_info
 from .lesson import Lesson
 from .lesson import Question
 from .sidebar import make_sidebar
-from utils.network import get_httpx_client
-from settings import get_settings
+from components.infra import backend
 
 
 class QuestionNoKey(BaseModel):
@@ -189,24 +188,31 @@ def grade(
         "lesson_type": lesson_type,
         "questions": st.session_state.exercise_lesson["data"],
     }
-    with get_httpx_client() as client:
-        resp = client.post(
-            f"{get_settings().connection.backend_url.unicode_string()}exercise/v1/grade",
-            json=d,
-        )
-        if resp.status_code != 200:
+    # Reruns of the result page render the grade kept for these answers
+    # instead of submitting them again.
+    submission = backend.client.submission_key(d)
+    graded = st.session_state.exercise_lesson.get("grade", None)
+    if graded and graded["submission"] == submission:
+        data = graded["result"]
+    else:
+        try:
+            resp = backend.grade(d)
+        except RuntimeError:
             st.error("Failed to submit exercise")
-            print(resp.text)
-        else:
-            data = Grade.model_validate(resp.json())
-            c1, c2 = st.columns([1, 4])
-            with c1:
-                st.write("Score:")
-            with c2:
-                st.write(f"{data.score}/{data.max_score}")
-            st.write("---")
-            st.write(data.overall_comment)
-            st.write("---")
-            st.write(data.detail_comment)
-            st.write("---")
-            st.write(data.suggestions)
+            return
+        data = Grade.model_validate(resp)
+        st.session_state.exercise_lesson["grade"] = {
+            "submission": submission,
+            "result": data,
+        }
+    c1, c2 = st.columns([1, 4])
+    with c1:
+        st.write("Score:")
+    with c2:
+        st.write(f"{data.score}/{data.max_score}")
+    st.write("---")
+    st.write(data.overall_comment)
+    st.write("---")
+    st.write(data.detail_comment)
+    st.write("---")
+    st.write(data.suggestions)
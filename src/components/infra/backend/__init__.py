@@ -0,0 +1,162 @@
+"""Synchronous facade over the async backend client.
+
+Every call is scheduled on the shared network event loop. Independent calls
+can be passed to `fetch_concurrently` so a page waits for the slowest of them
+instead of their sum, e.g.::
+
+    user_info, lessons = backend.fetch_concurrently(
+        backend.client.get_user(email),
+        backend.client.get_lessons(),
+    )
+
+Lookups made through the single-call helpers are memoized per script run
+(see `utils.rerun`), so components rendering the same lesson or user in one
+rerun share one request.
+"""
+
+from collections.abc import Awaitable, Iterator
+from typing import Any, TypeVar
+
+import logfire
+import streamlit as st
+
+from utils.network import (
+    get_bulkhead,
+    run_background,
+    run_sync,
+    gather_sync,
+    iterate_sync,
+)
+from utils.rerun import memoized
+
+from . import client
+from .lessons import get_lesson_cache
+from .search import get_lesson_index
+from .models import CreateUser, UpdateUser
+
+T = TypeVar("T")
+
+
+def _run(group: str, call: Awaitable[T]) -> T:
+    """Run one call, telling the user when it has to queue for capacity."""
+    if not get_bulkhead(group).saturated():
+        return run_sync(call)
+    with st.status("Waiting for capacity...") as status:
+        result = run_sync(call)
+        status.update(label="Done", state="complete")
+    return result
+
+
+def fetch_concurrently(*calls: Awaitable[Any]) -> list[Any]:
+    """Run independent backend calls at once.
+
+    Returns:
+        list[Any]: one result per call, in order. A call that failed yields
+        None, so callers handle it like the single-call helpers.
+    """
+    results = gather_sync(*calls)
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            logfire.error("Backend call failed", _exc_info=result)
+            results[i] = None
+    return results
+
+
+def prefetch(call: Awaitable[Any]):
+    """Start a lookup in the background so a later rerun finds it cached."""
+    run_background(call)
+
+
+def create_user(user: CreateUser):
+    return _run("write", client.create_user(user))
+
+
+def update_user(user: UpdateUser):
+    return _run("write", client.update_user(user))
+
+
+def get_user(email: str):
+    return memoized(("get_user", email), lambda: _run("lookup", client.get_user(email)))
+
+
+def get_lessons():
+    return memoized(("get_lessons",), lambda: _run("lookup", client.get_lessons()))
+
+
+def get_lesson_page(cursor: str | None = None, **query: Any):
+    return memoized(
+        ("get_lesson_page", cursor, *sorted(query.items())),
+        lambda: _run("lookup", client.get_lesson_page(cursor=cursor, **query)),
+    )
+
+
+def search_lessons(query: str | None = None, **options: Any):
+    return memoized(
+        ("search_lessons", query, *sorted(options.items())),
+        lambda: _run("lookup", client.search_lessons(query, **options)),
+    )
+
+
+def get_lesson(lesson_id: int):
+    return memoized(
+        ("get_lesson", lesson_id), lambda: _run("lookup", client.get_lesson(lesson_id))
+    )
+
+
+def upload_lesson(data: dict[str, Any]):
+    return _run("write", client.upload_lesson(data))
+
+
+def generate_lesson(payload: dict[str, Any], regenerate: bool = False):
+    return _run("generate", client.generate_lesson(payload, regenerate))
+
+
+def grade(payload: dict[str, Any]):
+    return _run("grade", client.grade(payload))
+
+
+def convert_audio(transcript: str, **params: Any):
+    return _run("audio", client.convert_audio(transcript, **params))
+
+
+def get_audio(uid: str):
+    return memoized(("get_audio", uid), lambda: _run("audio", client.get_audio(uid)))
+
+
+def get_lesson_audio(audio_url: str):
+    return memoized(
+        ("get_lesson_audio", audio_url),
+        lambda: _run("audio", client.get_lesson_audio(audio_url)),
+    )
+
+
+def transcribe_audio(data: bytes):
+    return _run("audio", client.transcribe_audio(data))
+
+
+def stream_chat(payload: dict[str, Any]) -> Iterator[str]:
+    return iterate_sync(client.stream_chat(payload))
+
+
+__all__ = [
+    "client",
+    "get_lesson_cache",
+    "get_lesson_index",
+    "fetch_concurrently",
+    "prefetch",
+    "create_user",
+    "update_user",
+    "get_user",
+    "get_lessons",
+    "get_lesson_page",
+    "search_lessons",
+    "get_lesson",
+    "upload_lesson",
+    "generate_lesson",
+    "grade",
+    "convert_audio",
+    "get_audio",
+    "get_lesson_audio",
+    "transcribe_audio",
+    "stream_chat",
+]
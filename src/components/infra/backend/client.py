@@ -1,47 +1,321 @@
-from settings import get_settings
+import asyncio
+from collections.abc import AsyncIterator
+import hashlib
+import json
+from typing import Any
 
-from utils.network import get_httpx_client
+from models.lesson import Lesson, LessonPage, LessonSummary
+from models.user import UserInfo
+import httpx
+import logfire
 
-from .models import CreateUser, UpdateUser, User
+from utils.audiocache import AudioAsset
+from utils.ttsmemo import normalize_transcript
+from utils.endpoints import get_endpoint
+from utils.network import (
+    request,
+    send,
+    send_stream,
+    fetch_cached,
+    get_cached_entry,
+    get_audio_cache,
+    get_generation_cache,
+    get_ttl_cache,
+    get_tts_memo,
+    build_audio_url,
+)
 
+from .lessons import get_lesson_cache
+from .search import get_lesson_index
+from .models import CreateUser, UpdateUser
 
-def create_user(user: CreateUser):
-    with get_httpx_client() as client:
-        resp = client.post(
-            build_url("user/v1/create"),
-            json=user.model_dump(),
+
+async def create_user(user: CreateUser) -> UserInfo:
+    resp = await send("user.create", json=user.model_dump())
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to create user")
+    else:
+        return UserInfo.model_validate(resp.json())
+
+
+async def update_user(user: UpdateUser) -> UserInfo:
+    resp = await send("user.update", json=user.model_dump())
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to update user")
+    else:
+        return UserInfo.model_validate(resp.json())
+
+
+def _parse_user(resp: httpx.Response) -> UserInfo | None:
+    if resp.status_code == 404:
+        return None
+    elif resp.status_code != 200:
+        raise RuntimeError("Failed to get user")
+    else:
+        return UserInfo.model_validate(resp.json())
+
+
+def _parse_lessons(resp: httpx.Response) -> list[Lesson]:
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to get lessons")
+    else:
+        lessons = get_lesson_cache()
+        return [lessons.validate(lesson) for lesson in resp.json()]
+
+
+def _parse_lesson(resp: httpx.Response) -> Lesson:
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to get lesson")
+    else:
+        return get_lesson_cache().validate(resp.json())
+
+
+async def get_user(email: str) -> UserInfo | None:
+    return await fetch_cached("user.get", _parse_user, email=email)
+
+
+def user_validated_at(user_info: UserInfo) -> float | None:
+    """When the backend last answered `get_user` with `user_info` (200 or
+    304), by `time.monotonic`; None if it is not the profile cached, e.g. one
+    a create or an update returned."""
+    entry = get_cached_entry("user.get", _parse_user, email=user_info.email)
+    if entry is None or entry.result is not user_info:
+        return None
+    return entry.validated_at
+
+
+async def get_lessons() -> list[Lesson]:
+    # Every session reads the catalog on every rerun; share it for a while.
+    return await get_ttl_cache("catalog").get(
+        "lessons",
+        lambda: fetch_cached("lesson.list", _parse_lessons),
+    )
+
+
+def _parse_summaries(resp: httpx.Response) -> list[LessonSummary]:
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to get lessons")
+    else:
+        summaries = [LessonSummary.model_validate(item) for item in resp.json()]
+        index = get_lesson_index()
+        for summary in summaries:
+            index.add(summary)
+        return summaries
+
+
+async def get_lesson_summaries() -> list[LessonSummary]:
+    """The catalog without lesson content, for the search index; shared for
+    a while like `get_lessons`."""
+    return await get_ttl_cache("catalog").get(
+        "summaries",
+        lambda: fetch_cached("lesson.list", _parse_summaries, view="summary"),
+    )
+
+
+def _parse_lesson_page(resp: httpx.Response) -> LessonPage:
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to get lessons")
+    else:
+        data = resp.json()
+        return LessonPage(
+            items=[LessonSummary.model_validate(item) for item in data["items"]],
+            next_cursor=data.get("next_cursor"),
+            total=data.get("total"),
+        )
+
+
+async def get_lesson_page(
+    limit: int = 20,
+    cursor: str | None = None,
+    sort: str = "id",
+    type: str | None = None,
+    level: int | None = None,
+    query: str | None = None,
+) -> LessonPage:
+    """One page of the catalog, from the page before's `next_cursor`.
+
+    Pages hold lesson summaries; `get_lesson` has the content. They are kept
+    for a while in the `lesson_pages` cache, so a page prefetched in the
+    background is served at once.
+    """
+    params = {
+        "view": "summary",
+        "limit": limit,
+        "cursor": cursor,
+        "sort": sort,
+        "type": type,
+        "level": level,
+        "q": query,
+    }
+    return await get_ttl_cache("lesson_pages").get(
+        tuple(params.items()),
+        lambda: fetch_cached("lesson.page", _parse_lesson_page, **params),
+    )
+
+
+async def search_lessons(
+    query: str | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+    sort: str = "relevance",
+    type: str | None = None,
+    level: int | None = None,
+) -> LessonPage:
+    """One page of the lessons matching `query`, best first unless `sort` says
+    otherwise, searched in this process's index of the catalog.
+
+    The index holds the catalog's summaries, and the content of the lessons
+    whose detail was fetched (`get_lesson`): words of a passage are found
+    once someone has opened its lesson.
+    """
+    # Reading the summaries keeps the index complete and up to date.
+    await get_lesson_summaries()
+    offset = int(cursor or 0)
+    # Ranking is CPU work; keep it off the network loop other sessions share.
+    result = await asyncio.to_thread(
+        get_lesson_index().search, query, type, level, sort, offset, limit
+    )
+    more = offset + limit < result.total
+    return LessonPage(
+        items=result.lessons,
+        next_cursor=str(offset + limit) if more else None,
+        total=result.total,
+        facets=result.facets,
+    )
+
+
+async def get_lesson(lesson_id: int) -> Lesson:
+    """The full lesson, kept by id in the `lesson_detail` cache."""
+    return await get_ttl_cache("lesson_detail").get(
+        lesson_id,
+        lambda: fetch_cached("lesson.get", _parse_lesson, lesson_id=lesson_id),
+    )
+
+
+async def upload_lesson(data: dict[str, Any]) -> dict[str, Any]:
+    resp = await send("lesson.upload", json={"data": data})
+    if resp.status_code != 200:
+        logfire.error(
+            "Uploading a lesson failed with {status}: {body}",
+            status=resp.status_code,
+            body=resp.text,
         )
-        if resp.status_code != 200:
-            raise RuntimeError("Failed to create user")
-        else:
-            return User.model_validate(resp.json())
+        raise RuntimeError("Failed to upload lesson")
+    else:
+        get_ttl_cache("catalog").invalidate()
+        get_ttl_cache("lesson_pages").invalidate()
+        return resp.json()
+
+
+def generation_key(payload: dict[str, Any]) -> str:
+    """Cache key of a generation request: the request with its passage
+    normalized, so the level, lesson type and any question or answer counts
+    are part of it."""
+    key = dict(payload)
+    for field in ("text", "transcript"):
+        if isinstance(key.get(field), str):
+            key[field] = normalize_transcript(key[field])
+    return json.dumps(key, sort_keys=True, ensure_ascii=False)
+
+
+async def generate_lesson(
+    payload: dict[str, Any], regenerate: bool = False
+) -> dict[str, Any]:
+    """Generate lesson content, reusing an earlier generation for the same
+    request unless `regenerate` is set."""
+    return await get_generation_cache().get(
+        generation_key(payload), lambda: _generate_lesson(payload), refresh=regenerate
+    )
+
+
+async def _generate_lesson(payload: dict[str, Any]) -> dict[str, Any]:
+    resp = await send("lesson.generate", json=payload)
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to generate lesson")
+    else:
+        return resp.json()["content"]
+
+
+def submission_key(payload: dict[str, Any]) -> str:
+    """SHA-256 of a grading submission; the same answers give the same key."""
+    data = json.dumps(
+        payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+async def grade(payload: dict[str, Any]) -> dict[str, Any]:
+    """Grade a submission once: a repeated submission within the `grade`
+    cache's ttl gets the first result, also while it is still being graded."""
+    key = submission_key(payload)
+    return await get_ttl_cache("grade").get(key, lambda: _grade(payload, key))
 
 
-def update_user(user: UpdateUser):
-    with get_httpx_client() as client:
-        resp = client.post(
-            build_url("user/v1/update"),
-            json=user.model_dump(),
+async def _grade(payload: dict[str, Any], key: str) -> dict[str, Any]:
+    resp = await send("exercise.grade", headers={"Idempotency-Key": key}, json=payload)
+    if resp.status_code != 200:
+        logfire.error(
+            "Grading failed with {status}: {body}",
+            status=resp.status_code,
+            body=resp.text,
         )
-        if resp.status_code != 200:
-            raise RuntimeError("Failed to update user")
-        else:
-            return User.model_validate(resp.json())
-
-
-def get_user(email: str):
-    with get_httpx_client() as client:
-        resp = client.get(build_url(f"user/v1/{email}"))
-        if resp.status_code != 200:
-            raise RuntimeError("Failed to get user")
-        else:
-            return User.model_validate(resp.json())
-
-
-def get_lessons():
-    with get_httpx_client() as client:
-        resp = client.get(build_url("lesson/v1/list"))
-        if resp.status_code != 200:
-            raise RuntimeError("Failed to get lessons")
-        else:
-            return resp.json()
+        raise RuntimeError("Failed to grade exercise")
+    else:
+        return resp.json()
+
+
+async def convert_audio(transcript: str, **params: Any) -> str:
+    """Convert text to speech, returning the audio uid. A conversion of the
+    same text with the same parameters (voice, format, ...) is reused."""
+    return await get_tts_memo().get(
+        transcript, params, lambda: _convert_audio(transcript, params)
+    )
+
+
+async def _convert_audio(transcript: str, params: dict[str, Any]) -> str:
+    resp = await send("audio.convert", json={"transcript": transcript, **params})
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to convert audio")
+    else:
+        return resp.json()["uid"]
+
+
+async def _fetch_audio(url: str) -> bytes:
+    # Lesson audio may live outside the backend; call it like the backend's.
+    route = get_endpoint("audio.get").route
+    resp = await request(
+        route.method,
+        url,
+        group=route.group,
+        timeout_class=route.timeout_class,
+        idempotent=route.idempotent,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to get audio")
+    else:
+        return resp.content
+
+
+async def get_audio(uid: str) -> bytes:
+    return await _fetch_audio(get_endpoint("audio.get").url(uid=uid))
+
+
+async def get_lesson_audio(audio_url: str) -> AudioAsset:
+    """A lesson's audio from the local audio cache, fetched on first use."""
+    url = build_audio_url(audio_url)
+    return await get_audio_cache().get(url, lambda: _fetch_audio(url))
+
+
+async def transcribe_audio(data: bytes) -> str:
+    resp = await send("audio.text", content=data)
+    if resp.status_code != 200:
+        raise RuntimeError("Failed to transcribe audio")
+    else:
+        return resp.json()["transcript"]
+
+
+async def stream_chat(payload: dict[str, Any]) -> AsyncIterator[str]:
+    async with send_stream("chat.stream", json=payload) as stream_resp:
+        if stream_resp.status_code == 200:
+            async for token in stream_resp.aiter_text():
+                yield token
@@ -0,0 +1,80 @@
+"""Validated lessons shared by every session.
+
+A lesson is parsed once per version: sessions showing the same lesson get the
+same `Lesson` instance, which is frozen so that no page can change it under
+the others. Each lesson validated is also added to the search index.
+"""
+
+from collections import OrderedDict
+import threading
+from typing import Any
+
+from models.lesson import Lesson
+from settings import get_settings
+
+from .search import get_lesson_index
+
+
+def lesson_version(payload: dict[str, Any]) -> str:
+    """The version of a lesson, from the fields the backend stamps on it.
+
+    Lessons cannot be edited once uploaded, so without an explicit `version`
+    or `updatedAt` their creation time tells versions apart. Hashing the
+    content instead would cost about as much as validating it.
+    """
+    for field in ("version", "updatedAt", "createdAt"):
+        if payload.get(field) is not None:
+            return str(payload[field])
+    return ""
+
+
+class LessonCache:
+    """
+    Least recently used `Lesson` instances by lesson id and version.
+
+    Args:
+        max_entries (int): Lessons kept; the least recently used go first.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lessons: OrderedDict[tuple[int, str], Lesson] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "miss": 0, "evictions": 0}
+
+    def validate(self, payload: dict[str, Any]) -> Lesson:
+        """Return the lesson `payload` describes, validating it only if this
+        version of it has not been seen before."""
+        key = (payload.get("id"), lesson_version(payload))
+        with self._lock:
+            lesson = self._lessons.get(key)
+            if lesson is not None:
+                self._lessons.move_to_end(key)
+                self._stats["hit"] += 1
+                return lesson
+        lesson = Lesson.model_validate(payload)
+        with self._lock:
+            # Another thread may have validated it meanwhile; keep one instance.
+            lesson = self._lessons.setdefault(key, lesson)
+            self._lessons.move_to_end(key)
+            self._stats["miss"] += 1
+            while len(self._lessons) > self.max_entries:
+                self._lessons.popitem(last=False)
+                self._stats["evictions"] += 1
+        # Callers validate off the network loop (see `get_coalesced`), so
+        # indexing does not hold up other sessions' requests.
+        get_lesson_index().add(lesson)
+        return lesson
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._lessons), **self._stats}
+
+
+_lesson_cache: LessonCache | None = None
+
+
+def get_lesson_cache() -> LessonCache:
+    global _lesson_cache
+    if _lesson_cache is None:
+        _lesson_cache = LessonCache(get_settings().connection.cache.lessons)
+    return _lesson_cache
@@ -0,0 +1,280 @@
+"""Full-text search over the lessons this process has seen.
+
+The catalog's summaries and every lesson validated by the lesson cache are
+added to an inverted index, so the index follows the catalog as it is
+fetched, opened and uploaded to, without a rebuild. Summaries have no
+content: the passage and questions of a lesson are searchable once its
+detail has been fetched. Tokens are accent-folded (`utils.validate.fold_accents`): a search
+for "tieng viet" finds "Tiếng Việt". Matches are ranked with BM25 and can be
+narrowed by lesson type and level, with the counts of each (facets).
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+import heapq
+from itertools import islice
+import math
+import re
+import threading
+
+from models.lesson import (
+    Lesson,
+    LessonSummary,
+    Level,
+    ListeningLessonContent,
+    ReadingLessonContent,
+    SpeakingLessonContent,
+    parse_level,
+)
+from utils.validate import fold_accents, normalize_text
+
+_TOKEN = re.compile(r"\w+")
+# BM25 parameters, the usual defaults.
+K1 = 1.2
+B = 0.75
+# Matches in the name count three times, in the description twice.
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 2.0
+SORT_KEYS = {
+    "id": lambda lesson: lesson.id,
+    "name": lambda lesson: (lesson.name, lesson.id),
+    "createdAt": lambda lesson: (lesson.createdAt, lesson.id),
+}
+
+
+@lru_cache(maxsize=1 << 16)
+def _fold(token: str) -> str:
+    return fold_accents(token)
+
+
+def tokenize(text: str) -> list[str]:
+    """The searchable words of `text`, lowercase and without diacritics."""
+    # Folding word by word lets the cache skip the words seen before, which
+    # is most of them.
+    return [_fold(token) for token in _TOKEN.findall(normalize_text(text))]
+
+
+def lesson_text(lesson: Lesson | LessonSummary) -> str:
+    """The author, passage and question text of a lesson; the author of a
+    summary."""
+    if isinstance(lesson, LessonSummary):
+        return lesson.authorName
+    content = lesson.content
+    parts = [lesson.author.name]
+    if isinstance(content, ReadingLessonContent):
+        parts.append(content.text)
+    elif isinstance(content, ListeningLessonContent):
+        parts.append(content.transcript)
+    elif isinstance(content, SpeakingLessonContent):
+        parts += [content.topic, content.main_question, *content.guidelines]
+    for question in getattr(content, "questions", ()):
+        parts += [question.question, *question.answers]
+    return "\n".join(parts)
+
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    """A window of the lessons matching a search, best first.
+
+    `facets` counts the matches by `type` (value) and `level` (`A1`...), each
+    with the other filter applied, so they tell what choosing one would give.
+    """
+
+    lessons: list[LessonSummary]
+    total: int
+    facets: dict[str, dict[str, int]]
+
+
+class LessonIndex:
+    """
+    Inverted index of lessons, by accent-folded word.
+
+    Lessons are added whole or as summaries, and found as summaries. A
+    lesson added again replaces its previous version, except that the
+    summary of a lesson indexed whole keeps its content words. The BM25
+    weights of
+    the words searched for and the sort orders are computed on first use and
+    kept until the index changes. Safe to use from any thread.
+    """
+
+    def __init__(self):
+        self._lessons: dict[int, LessonSummary] = {}
+        # What each lesson was indexed from, a `Lesson` or its summary
+        self._sources: dict[int, Lesson | LessonSummary] = {}
+        # word -> lesson id -> weighted count of the word in the lesson
+        self._postings: dict[str, dict[int, float]] = {}
+        self._terms: dict[int, tuple[str, ...]] = {}
+        self._lengths: dict[int, float] = {}
+        self._total_length = 0.0
+        self._by_type: dict[str, set[int]] = {}
+        self._by_level: dict[int, set[int]] = {}
+        # word -> lesson id -> BM25 score of the word for the lesson
+        self._weights: dict[str, dict[int, float]] = {}
+        # sort field -> lesson ids in ascending order
+        self._orders: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lessons)
+
+    def add(self, lesson: Lesson | LessonSummary):
+        """Index `lesson`, replacing any other version of it."""
+        if self._sources.get(lesson.id) is lesson:
+            return
+        if isinstance(lesson, LessonSummary):
+            if self._lessons.get(lesson.id) == lesson:
+                return  # unchanged, or the summary of the lesson indexed
+            summary = lesson
+        else:
+            summary = LessonSummary.of(lesson)
+        counts: Counter[str] = Counter()
+        for weight, text in (
+            (NAME_WEIGHT, lesson.name),
+            (DESCRIPTION_WEIGHT, lesson.description),
+            (1.0, lesson_text(lesson)),
+        ):
+            for token in tokenize(text):
+                counts[token] += weight
+        with self._lock:
+            self._remove(lesson.id)
+            self._lessons[lesson.id] = summary
+            self._sources[lesson.id] = lesson
+            self._terms[lesson.id] = tuple(counts)
+            for term, count in counts.items():
+                self._postings.setdefault(term, {})[lesson.id] = count
+            self._lengths[lesson.id] = length = sum(counts.values())
+            self._total_length += length
+            self._by_type.setdefault(lesson.type.value, set()).add(lesson.id)
+            self._by_level.setdefault(int(lesson.level), set()).add(lesson.id)
+            # Every weight depends on the number and average length of lessons.
+            self._weights.clear()
+            self._orders.clear()
+
+    def _remove(self, lesson_id: int):
+        lesson = self._lessons.pop(lesson_id, None)
+        if lesson is None:
+            return
+        del self._sources[lesson_id]
+        for term in self._terms.pop(lesson_id):
+            posting = self._postings[term]
+            del posting[lesson_id]
+            if not posting:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(lesson_id)
+        self._by_type[lesson.type.value].discard(lesson_id)
+        self._by_level[int(lesson.level)].discard(lesson_id)
+
+    def search(
+        self,
+        query: str | None = None,
+        type: str | None = None,
+        level: int | None = None,
+        sort: str = "relevance",
+        offset: int = 0,
+        limit: int = 20,
+    ) -> SearchResult:
+        """Lessons containing every word of `query` (all of them if there is
+        none), of `type` and `level` if given.
+
+        Args:
+            sort (str): `relevance` (BM25), or `id`, `name`, `createdAt`,
+                prefixed with `-` for descending. Without a query,
+                `relevance` is `id`.
+
+        Raises:
+            ValueError: `sort` is not one of the above.
+        """
+        field, descending = sort.lstrip("-"), sort.startswith("-")
+        if field != "relevance" and field not in SORT_KEYS:
+            raise ValueError(f"Cannot sort by {sort}")
+        terms = list(dict.fromkeys(tokenize(query or "")))
+        end = offset + limit
+        with self._lock:
+            weights = [self._term_weights(term) for term in terms]
+            facets, matches = self._match(weights, type, level)
+            if field == "relevance" and weights:
+                if len(weights) == 1:
+                    score = weights[0].__getitem__
+                else:
+                    ids = list(matches)
+                    totals = map(sum, zip(*[map(w.__getitem__, ids) for w in weights]))
+                    score = dict(zip(ids, totals)).__getitem__
+                ranked = heapq.nlargest(end, matches, key=score)
+            else:
+                field = "id" if field == "relevance" else field
+                order = self._order(field)
+                if len(matches) ** 2 < end * len(order):
+                    # Few matches: sorting them beats scanning the order.
+                    key, lessons = SORT_KEYS[field], self._lessons
+                    ranked = sorted(
+                        matches, key=lambda i: key(lessons[i]), reverse=descending
+                    )[:end]
+                else:
+                    scan = reversed(order) if descending else iter(order)
+                    ranked = list(islice((i for i in scan if i in matches), end))
+            window = [self._lessons[i] for i in ranked[offset:end]]
+        return SearchResult(window, len(matches), facets)
+
+    def _term_weights(self, term: str) -> dict[int, float]:
+        weights = self._weights.get(term)
+        if weights is None:
+            posting = self._postings.get(term, {})
+            n = len(self._lessons)
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            scale = K1 * n / self._total_length if posting else 0.0
+            lengths = self._lengths
+            weights = self._weights[term] = {
+                i: idf * tf * (K1 + 1) / (tf + K1 * (1 - B) + B * scale * lengths[i])
+                for i, tf in posting.items()
+            }
+        return weights
+
+    def _match(
+        self, weights: list[dict[int, float]], type: str | None, level: int | None
+    ) -> tuple[dict[str, dict[str, int]], set[int]]:
+        if weights:
+            # Intersect from the rarest word, so common words cost little.
+            weights = sorted(weights, key=len)
+            ids = set(weights[0])
+            for w in weights[1:]:
+                ids.intersection_update(w)
+        else:
+            ids = set(self._lessons)
+        of_type = ids if type is None else ids & self._by_type.get(type, set())
+        of_level = ids if level is None else ids & self._by_level.get(level, set())
+        facets = {
+            "type": {t: len(of_level & s) for t, s in self._by_type.items()},
+            "level": {
+                parse_level(Level(lvl)): len(of_type & s)
+                for lvl, s in sorted(self._by_level.items())
+            },
+        }
+        for counts in facets.values():
+            for key in [k for k, count in counts.items() if not count]:
+                del counts[key]
+        return facets, of_type & of_level
+
+    def _order(self, field: str) -> list[int]:
+        order = self._orders.get(field)
+        if order is None:
+            key, lessons = SORT_KEYS[field], self._lessons
+            order = self._orders[field] = sorted(lessons, key=lambda i: key(lessons[i]))
+        return order
+
+    def stats(self) -> dict[str, int]:
+        return {"lessons": len(self._lessons), "terms": len(self._postings)}
+
+
+_lesson_index: LessonIndex | None = None
+_lesson_index_lock = threading.Lock()
+
+
+def get_lesson_index() -> LessonIndex:
+    global _lesson_index
+    with _lesson_index_lock:
+        if _lesson_index is None:
+            _lesson_index = LessonIndex()
+    return _lesson_index
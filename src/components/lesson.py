@@ -3,8 +3,9 @@ from pydantic import BaseModel
 from enum import Enum
 import streamlit as st
 
-from utils.network import get_httpx_client
-from settings import get_settings
+from components.infra import backend
+from utils.network import build_audio_url
+from components.lessons.audio import lesson_audio
 
 
 class LessonType(str, Enum):
@@ -65,15 +66,10 @@ class Lesson(BaseModel):
 
 
 def get_lessons():
-    with get_httpx_client() as client:
-        lessons: list[Lesson] = []
-        resp = client.get(
-            f"{get_settings().connection.backend_url.unicode_string()}lesson/v1/list"
-        )
-        if resp.status_code == 200:
-            return [Lesson.model_validate(lesson) for lesson in resp.json()]
-        else:
-            return lessons
+    try:
+        return backend.get_lessons()
+    except RuntimeError:
+        return []
 
 
 def parse_lesson_info(lesson: Lesson):
@@ -122,6 +118,10 @@ class Question(BaseModel):
     correct_answer: int
 
 
+# "Generate" reuses an earlier generation of the same passage and level.
+REGENERATE_HELP = "Ask for new questions instead of the ones generated before"
+
+
 class GeneratedReadingLesson(BaseModel):
     text: str
     questions: list[Question]
@@ -138,56 +138,53 @@ class GeneratedSpeakingLesson(BaseModel):
     guidelines: list[str]
 
 
-def generate_reading_lesson_call(text: str, level: int):
-    with get_httpx_client() as client:
-        resp = client.post(
-            f"{get_settings().connection.backend_url.unicode_string()}lesson/v1/generate",
-            json={
+def generate_reading_lesson_call(text: str, level: int, regenerate: bool = False):
+    try:
+        resp = backend.generate_lesson(
+            {
                 "text": text,
                 "level": level,
                 "type": "reading",
             },
+            regenerate=regenerate,
         )
-        if resp.status_code != 200:
-            return None
-        else:
-            content = GeneratedReadingLesson.model_validate(resp.json()["content"])
-            return content
+    except RuntimeError:
+        return None
+    else:
+        content = GeneratedReadingLesson.model_validate(resp)
+        return content
 
 
-def generate_listening_lesson_call(transcript: str, level: int):
-    with get_httpx_client() as client:
-        resp = client.post(
-            f"{get_settings().connection.backend_url.unicode_string()}lesson/v1/generate",
-            json={
+def generate_listening_lesson_call(
+    transcript: str, level: int, regenerate: bool = False
+):
+    try:
+        resp = backend.generate_lesson(
+            {
                 "transcript": transcript,
                 "level": level,
                 "type": "listening",
             },
+            regenerate=regenerate,
         )
-        if resp.status_code != 200:
-            return None
-        else:
-            content = GeneratedListeningLesson.model_validate(resp.json()["content"])
-            return content
+    except RuntimeError:
+        return None
+    else:
+        content = GeneratedListeningLesson.model_validate(resp)
+        return content
 
 
 def generate_audio(transcript: str):
-    with get_httpx_client() as client:
-        audio_resp = client.post(
-            f"{get_settings().connection.backend_url.unicode_string()}resources/v1/audio/convert",
-            json={
-                "transcript": transcript,
-            },
-        )
-        if audio_resp.status_code != 200:
-            return None
-        audioUrl = f"{get_settings().connection.backend_url.unicode_string()}resources/v1/audio/{audio_resp.json()["uid"]}"
-        return audioUrl
+    try:
+        uid = backend.convert_audio(transcript)
+    except RuntimeError:
+        return None
+    audioUrl = build_audio_url(uid)
+    return audioUrl
 
 
-def generate_reading_lesson(text: str, level: int):
-    content = generate_reading_lesson_call(text, level)
+def generate_reading_lesson(text: str, level: int, regenerate: bool = False):
+    content = generate_reading_lesson_call(text, level, regenerate)
     if not content:
         st.error("Failed to generate reading lesson")
     else:
@@ -204,8 +201,8 @@ def generate_reading_lesson(text: str, level: int):
         st.session_state.creating_lesson_data["questions"] = qs
 
 
-def generate_listening_lesson(transcript: str, level: int):
-    content = generate_listening_lesson_call(transcript, level)
+def generate_listening_lesson(transcript: str, level: int, regenerate: bool = False):
+    content = generate_listening_lesson_call(transcript, level, regenerate)
     if not content:
         st.error("Failed to generate listening lesson")
     else:
@@ -289,12 +286,16 @@ def creating_reading_lesson_p1(level: str):
         )
     elif len(text.split(" ")) < 10:
         st.session_state.creating_lesson_valid = "Paragraph must be more than 10 words"
-    generate = st.button("Generate")
-    if generate:
+    c1, c2 = st.columns(2)
+    with c1:
+        generate = st.button("Generate")
+    with c2:
+        regenerate = st.button("Regenerate", help=REGENERATE_HELP)
+    if generate or regenerate:
         if text == "":
             st.error("Paragraph must not be empty")
         else:
-            generate_reading_lesson(text, parse_level_inv(level))
+            generate_reading_lesson(text, parse_level_inv(level), regenerate)
     _questions = st.session_state.creating_lesson_data.get("questions", None)
     _num_questions = len(_questions) if _questions else 4
     _num_answer_each = (
@@ -326,7 +327,7 @@ def creating_listening_lesson_p1(level: str):
         )
     elif len(text.split(" ")) < 10:
         st.session_state.creating_lesson_valid = "Transcript must be more than 10 words"
-    c1, c2 = st.columns(2)
+    c1, c2, c3 = st.columns(3)
     with c1:
         generate_audio_btn = st.button("Generate Audio")
         if generate_audio_btn:
@@ -340,13 +341,15 @@ def creating_listening_lesson_p1(level: str):
                     st.session_state.creating_lesson_data["audio_url"] = audio_url
     with c2:
         generate = st.button("Generate")
-        if generate:
-            if text == "":
-                st.error("Transcript must not be empty")
-            else:
-                generate_reading_lesson(text, parse_level_inv(level))
+    with c3:
+        regenerate = st.button("Regenerate", help=REGENERATE_HELP)
+    if generate or regenerate:
+        if text == "":
+            st.error("Transcript must not be empty")
+        else:
+            generate_listening_lesson(text, parse_level_inv(level), regenerate)
     if st.session_state.creating_lesson_data.get("audio_url", None):
-        st.audio(st.session_state.creating_lesson_data["audio_url"])
+        lesson_audio(st.session_state.creating_lesson_data["audio_url"])
 
     _questions = st.session_state.creating_lesson_data.get("questions", None)
     _num_questions = len(_questions) if _questions else 4
@@ -433,40 +436,34 @@ def create_reading_lesson(name: str, description: str, lesson_type: str, level:
     submitted = st.button("Submit")
     if submitted:
         if st.session_state.creating_lesson_valid == "ok":
-            with get_httpx_client() as client:
-                resp = client.post(
-                    f"{get_settings().connection.backend_url.unicode_string()}lesson/v1/upload",
-                    json={
-                        "data": {
-                            "authorId": st.session_state.user_info.id,
-                            "name": name,
-                            "description": description,
-                            "type": lesson_type,
-                            "level": parse_level_inv(level),
-                            "content": {
-                                "text": text,
-                                "questions": st.session_state.creating_lesson_data[
-                                    "questions"
-                                ],
-                            },
-                        },
-                    },
-                )
-                if resp.status_code == 200:
-
-                    st.session_state.creating_lesson_data_finished = True
-                    st.session_state.creating_lesson_info = {
+            try:
+                backend.upload_lesson(
+                    {
+                        "authorId": st.session_state.user_info.id,
                         "name": name,
                         "description": description,
                         "type": lesson_type,
-                        "level": level,
+                        "level": parse_level_inv(level),
+                        "content": {
+                            "text": text,
+                            "questions": st.session_state.creating_lesson_data[
+                                "questions"
+                            ],
+                        },
                     }
-                    st.success("Uploaded successfully")
-                    st.switch_page("pages/display.py")
-
-                else:
-                    st.error("Failed to upload")
-                    print(resp.text)
+                )
+            except RuntimeError:
+                st.error("Failed to upload")
+            else:
+                st.session_state.creating_lesson_data_finished = True
+                st.session_state.creating_lesson_info = {
+                    "name": name,
+                    "description": description,
+                    "type": lesson_type,
+                    "level": level,
+                }
+                st.success("Uploaded successfully")
+                st.switch_page("pages/display.py")
 
         else:
             st.error(st.session_state.creating_lesson_valid)
@@ -505,66 +502,61 @@ def create_listening_lesson(name: str, description: str, lesson_type: str, level
     submitted = st.button("Submit")
     if submitted:
         if st.session_state.creating_lesson_valid == "ok":
-            with get_httpx_client() as client:
-                resp = client.post(
-                    f"{get_settings().connection.backend_url.unicode_string()}lesson/v1/upload",
-                    json={
-                        "data": {
-                            "authorId": st.session_state.user_info.id,
-                            "name": name,
-                            "description": description,
-                            "type": lesson_type,
-                            "level": parse_level_inv(level),
-                            "content": {
-                                "transcript": text,
-                                "audio_url": st.session_state.creating_lesson_data[
-                                    "audio_url"
-                                ],
-                                "questions": st.session_state.creating_lesson_data[
-                                    "questions"
-                                ],
-                            },
-                        },
-                    },
-                )
-                if resp.status_code == 200:
-
-                    st.session_state.creating_lesson_data_finished = True
-                    st.session_state.creating_lesson_info = {
+            try:
+                backend.upload_lesson(
+                    {
+                        "authorId": st.session_state.user_info.id,
                         "name": name,
                         "description": description,
                         "type": lesson_type,
-                        "level": level,
+                        "level": parse_level_inv(level),
+                        "content": {
+                            "transcript": text,
+                            "audio_url": st.session_state.creating_lesson_data[
+                                "audio_url"
+                            ],
+                            "questions": st.session_state.creating_lesson_data[
+                                "questions"
+                            ],
+                        },
                     }
-                    st.success("Uploaded successfully")
-                    st.switch_page("pages/display.py")
-                else:
-                    st.error("Failed to upload")
-                    print(resp.text)
+                )
+            except RuntimeError:
+                st.error("Failed to upload")
+            else:
+                st.session_state.creating_lesson_data_finished = True
+                st.session_state.creating_lesson_info = {
+                    "name": name,
+                    "description": description,
+                    "type": lesson_type,
+                    "level": level,
+                }
+                st.success("Uploaded successfully")
+                st.switch_page("pages/display.py")
 
         else:
             st.error(st.session_state.creating_lesson_valid)
 
 
-def generate_speaking_lesson_call(topic: str, level: int):
-    with get_httpx_client() as client:
-        resp = client.post(
-            f"{get_settings().connection.backend_url.unicode_string()}lesson/v1/generate",
-            json={
+def generate_speaking_lesson_call(topic: str, level: int, regenerate: bool = False):
+    try:
+        resp = backend.generate_lesson(
+            {
                 "text": topic,
                 "level": level,
                 "type": "speaking",
             },
+            regenerate=regenerate,
         )
-        if resp.status_code != 200:
-            return None
-        else:
-            content = GeneratedSpeakingLesson.model_validate(resp.json()["content"])
-            return content
+    except RuntimeError:
+        return None
+    else:
+        content = GeneratedSpeakingLesson.model_validate(resp)
+        return content
 
 
-def generate_speaking_lesson(topic: str, level: str):
-    content = generate_speaking_lesson_call(topic, parse_level_inv(level))
+def generate_speaking_lesson(topic: str, level: str, regenerate: bool = False):
+    content = generate_speaking_lesson_call(topic, parse_level_inv(level), regenerate)
     if not content:
         st.error("Failed to generate speaking lesson")
     else:
@@ -594,12 +586,18 @@ def create_speaking_lesson(name: str, description: str, lesson_type: str, level:
     topic = st.text_input("Topic", key="speaking_topic")
     if topic == "":
         st.session_state.creating_lesson_valid = "Topic cannot be empty"
-    generate_button = st.button("Generate", key="speaking_generate")
-    if generate_button:
+    c1, c2 = st.columns(2)
+    with c1:
+        generate_button = st.button("Generate", key="speaking_generate")
+    with c2:
+        regenerate_button = st.button(
+            "Regenerate", key="speaking_regenerate", help=REGENERATE_HELP
+        )
+    if generate_button or regenerate_button:
         if topic == "":
             st.session_state.creating_lesson_valid = "Topic cannot be empty"
         else:
-            generate_speaking_lesson(topic, level)
+            generate_speaking_lesson(topic, level, regenerate_button)
     _question = st.session_state.creating_lesson_data.get("questions", None)
     _main_question_value = ""
     _num_guidelines = 3
@@ -647,41 +645,37 @@ def create_speaking_lesson(name: str, description: str, lesson_type: str, level:
     summitted = st.button("Submit", key="speaking_submit")
     if summitted:
         if st.session_state.creating_lesson_valid == "ok":
-            with get_httpx_client() as client:
-                resp = client.post(
-                    f"{get_settings().connection.backend_url.unicode_string()}lesson/v1/upload",
-                    json={
-                        "data": {
-                            "authorId": st.session_state.user_info.id,
-                            "name": name,
-                            "description": description,
-                            "type": lesson_type,
-                            "level": parse_level_inv(level),
-                            "content": {
-                                "topic": topic,
-                                "main_question": st.session_state.creating_lesson_data["questions"]["main_question"],  # type: ignore
-                                "guidelines": st.session_state.creating_lesson_data[
-                                    "questions"
-                                ][
-                                    "guidelines"
-                                ],  # type: ignore
-                            },
-                        },
-                    },
-                )
-                if resp.status_code != 200:
-                    st.error("Failed to upload")
-                    print(resp.text)
-                else:
-                    st.session_state.creating_lesson_data_finished = True
-                    st.session_state.creating_lesson_info = {
+            try:
+                backend.upload_lesson(
+                    {
+                        "authorId": st.session_state.user_info.id,
                         "name": name,
                         "description": description,
                         "type": lesson_type,
-                        "level": level,
+                        "level": parse_level_inv(level),
+                        "content": {
+                            "topic": topic,
+                            "main_question": st.session_state.creating_lesson_data["questions"]["main_question"],  # type: ignore
+                            "guidelines": st.session_state.creating_lesson_data[
+                                "questions"
+                            ][
+                                "guidelines"
+                            ],  # type: ignore
+                        },
                     }
-                    st.success("Uploaded successfully")
-                    st.switch_page("pages/display.py")
+                )
+            except RuntimeError:
+                st.error("Failed to upload")
+            else:
+                st.session_state.creating_lesson_data_finished = True
+                st.session_state.creating_lesson_info = {
+                    "name": name,
+                    "description": description,
+                    "type": lesson_type,
+                    "level": level,
+                }
+                st.success("Uploaded successfully")
+                st.switch_page("pages/display.py")
 
         else:
             st.error(st.session_state.creating_lesson_valid)
@@ -0,0 +1,19 @@
+import streamlit as st
+
+from components.infra import backend
+from utils.network import build_audio_url
+
+
+def lesson_audio(audio_url: str, **kwargs):
+    """Play a lesson's audio from the local audio cache.
+
+    Streamlit serves the cached file itself, range requests included, so the
+    backend sends each recording once instead of once per student and replay.
+    When it cannot be fetched, the browser is pointed at the backend instead.
+    """
+    try:
+        asset = backend.get_lesson_audio(audio_url)
+    except RuntimeError:
+        st.audio(build_audio_url(audio_url), **kwargs)
+    else:
+        st.audio(str(asset.path), format=asset.mimetype, **kwargs)
@@ -12,8 +12,10 @@ from models.lesson import (
     ReadingLessonContent,
     SpeakingLessonContent,
 )
-from utils.network import get_httpx_client, build_url
+from components.infra import backend
 from ..chat import chat_sidebar
+from .audio import lesson_audio
+from ..user import remember_user_info, user_info_call
 
 
 def do_exercise():
@@ -21,6 +23,18 @@ def do_exercise():
     if not lesson_id:
         st.switch_page("pages/error.py")
     else:
+        lesson = st.session_state.exercise_lesson.get("lesson", None)
+        if not lesson:
+            # The lesson and the student's profile (needed to turn in) do not
+            # depend on each other, so fetch them together.
+            user_info, lesson = backend.fetch_concurrently(
+                user_info_call(),
+                backend.client.get_lesson(lesson_id),
+            )
+            remember_user_info(user_info)
+            if not lesson:
+                st.switch_page("pages/error.py")
+            st.session_state.exercise_lesson["lesson"] = lesson
         lesson = get_lesson(lesson_id)
 
         st.title(f"Exercise: {lesson.name}")
@@ -29,33 +43,28 @@ def do_exercise():
 
 
 def get_lesson(lesson_id: int):
+    # Lessons come validated and frozen from the backend client, so the stored
+    # instance is used as is on every rerun; only raw data is parsed, once.
     lesson = st.session_state.exercise_lesson.get("lesson", None)
     if not lesson:
-        with get_httpx_client() as client:
-            resp = client.get(
-                build_url(f"lesson/v1/{lesson_id}"),
-            )
-            if resp.status_code != 200:
-                st.switch_page("pages/error.py")
-
-            else:
-                lesson = Lesson.model_validate(resp.json())
-    else:
-        lesson = Lesson.model_validate(lesson)
+        try:
+            lesson = backend.get_lesson(lesson_id)
+        except RuntimeError:
+            st.switch_page("pages/error.py")
+    elif not isinstance(lesson, Lesson):
+        lesson = backend.get_lesson_cache().validate(lesson)
+        st.session_state.exercise_lesson["lesson"] = lesson
     return lesson
 
 
 def get_lesson_content_main_text(lesson: Lesson):
     match lesson.type:
         case LessonType.READING:
-            lesson.content = cast(ReadingLessonContent, lesson.content)
-            return lesson.content.text
+            return cast(ReadingLessonContent, lesson.content).text
         case LessonType.SPEAKING:
-            lesson.content = cast(SpeakingLessonContent, lesson.content)
-            return lesson.content.main_question
+            return cast(SpeakingLessonContent, lesson.content).main_question
         case LessonType.LISTENING:
-            lesson.content = cast(ListeningLessonContent, lesson.content)
-            return lesson.content.transcript
+            return cast(ListeningLessonContent, lesson.content).transcript
 
 
 def turn_in(lesson: Lesson):
@@ -63,7 +72,7 @@ def turn_in(lesson: Lesson):
     st.session_state.exercise_lesson["final_data"] = {
         "lesson_id": lesson.id,
         "user_id": st.session_state.user_info.id,
-        "text": text,
+        "transcript": text,
         "level": lesson.level,
         "lesson_type": lesson.type.value,
     }
@@ -134,7 +143,9 @@ def assistant(lesson: Lesson):
 
 
 def display_exercise_session(lesson: Lesson):
-    st.button("Turn in", on_click=turn_in)
+    # Not a callback: pages cannot be switched from callbacks.
+    if st.button("Turn in"):
+        turn_in(lesson)
     st.button("Assistant", on_click=assistant, args=(lesson,))
 
     match lesson.type:
@@ -206,7 +217,7 @@ def exercise_listening(lesson: Lesson):
     if play_btn:
         st.session_state.exercise_lesson["play_listening_audio"] = True
     if st.session_state.get("play_listening_audio", False):
-        st.audio(content.audio_url, autoplay=True)
+        lesson_audio(content.audio_url, autoplay=True)
     st.write("---")
     st.header("Questions")
     st.write("---")
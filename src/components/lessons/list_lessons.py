@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 from datetime import datetime
+import pandas as pd
 import streamlit as st
 from ..callbacks import rerun_page
 from models.lesson import (
-    Lesson,
+    LessonPage,
+    LessonSummary,
+    LessonType,
+    Level,
     ReadingLessonContent,
     ListeningLessonContent,
     SpeakingLessonContent,
@@ -12,81 +16,237 @@ from models.lesson import (
     parse_level,
 )
 
-from utils.network import get_httpx_client, build_url, build_audio_url
+from components.infra import backend
+from .audio import lesson_audio
 
+PAGE_SIZES = [10, 20, 50]
+SORTS = {
+    "Relevance": "relevance",
+    "Id": "id",
+    "Newest": "-createdAt",
+    "Oldest": "createdAt",
+    "Name": "name",
+}
 
-def show_lesson_list():
-    lessons = get_lessons()
-    if lessons is None:
-        st.error("Failed to get lessons")
-        lessons = []
-    col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 1, 1])
-    with col1:
-        st.header("Name")
-        st.divider()
-    with col2:
-        st.header("Type")
-        st.divider()
-    with col3:
-        st.header("Author")
-        st.divider()
-    with col4:
-        st.header("Detail")
-        st.divider()
-    with col5:
-        st.header("Action")
-        st.divider()
-    for i, lesson in enumerate(lessons):
-        with st.container():
-            col1, col2, col3, col4, col5 = st.columns(
-                [2, 1, 1, 1, 1], vertical_alignment="center"
-            )
-            with col1:
-                st.write(f"{lesson.id}. {lesson.name}")
-            with col2:
-                st.write(f"{lesson.type.value.upper()}")
-            with col3:
-                st.write(f"{lesson.author.name}")
-            with col4:
-                st.button(
-                    "Detail",
-                    key=f"lesson_detail_{lesson.id}",
-                    on_click=show_detail,
-                    args=(lesson,),
-                )
-            with col5:
-                do_btn = st.button(
-                    "Do",
-                    key=f"lesson_do_{lesson.id}",
+
+def _list_state() -> dict:
+    if "lesson_list" not in st.session_state:
+        st.session_state.lesson_list = {
+            "query": None,
+            "cursors": [None],
+            "page": 0,
+            "selected": None,
+            "generation": 0,
+        }
+    return st.session_state.lesson_list
+
+
+def lesson_list_query() -> dict:
+    """The catalog query the list controls describe (read before they render,
+    so the page can be fetched along with the other lookups of the rerun)."""
+    level = st.session_state.get("lesson_list_level", None)
+    return {
+        "limit": st.session_state.get("lesson_list_size", PAGE_SIZES[1]),
+        "sort": SORTS[st.session_state.get("lesson_list_sort", "Relevance")],
+        "type": st.session_state.get("lesson_list_type", None),
+        "level": level.value if level else None,
+        "query": st.session_state.get("lesson_list_search", "") or None,
+    }
+
+
+def lesson_page_call():
+    """Fetch of the page the list shows, for `backend.fetch_concurrently`.
+    A changed query starts again from the first page."""
+    state = _list_state()
+    query = lesson_list_query()
+    if query != state["query"]:
+        state.update(query=query, cursors=[None], page=0, selected=None)
+        state["generation"] += 1
+    return _page_call(state["cursors"][state["page"]], query)
+
+
+def _page_call(cursor: str | None, query: dict):
+    # Searches run on the local index of the catalog, browsing on the backend.
+    if query["query"]:
+        return backend.client.search_lessons(cursor=cursor, **query)
+    if query["sort"] == "relevance":
+        query = {**query, "sort": "id"}
+    return backend.client.get_lesson_page(cursor=cursor, **query)
+
+
+def _next_page(next_cursor: str):
+    state = _list_state()
+    del state["cursors"][state["page"] + 1 :]
+    state["cursors"].append(next_cursor)
+    state["page"] += 1
+    state["selected"] = None
+
+
+def _previous_page():
+    state = _list_state()
+    state["page"] = max(state["page"] - 1, 0)
+    state["selected"] = None
+
+
+def _select_lesson(key: str, ids: list[int]):
+    rows = st.session_state[key].selection.rows
+    _list_state()["selected"] = ids[rows[0]] if rows else None
+
+
+def lessons_frame(lessons: list[LessonSummary]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Id": [lesson.id for lesson in lessons],
+            "Name": [lesson.name for lesson in lessons],
+            "Type": [lesson.type.value.upper() for lesson in lessons],
+            "Level": [parse_level(lesson.level) for lesson in lessons],
+            "Author": [lesson.authorName for lesson in lessons],
+            "Created": [lesson.createdAt for lesson in lessons],
+        }
+    )
+
+
+def show_lesson_table(lessons: list[LessonSummary]):
+    """The lessons as one table; Detail and Do act on the selected row, so the
+    number of elements does not grow with the page size."""
+    state = _list_state()
+    # A table per query and page, so a selection does not carry over.
+    key = f"lesson_table_{state['generation']}_{state['page']}"
+    ids = [lesson.id for lesson in lessons]
+    st.dataframe(
+        lessons_frame(lessons),
+        key=key,
+        on_select=lambda: _select_lesson(key, ids),
+        selection_mode="single-row",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Created": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm")
+        },
+    )
+    lesson = next((l for l in lessons if l.id == state["selected"]), None)
+    c1, c2, c3 = st.columns([4, 1, 1], vertical_alignment="center")
+    with c1:
+        st.write(f"**{lesson.name}**" if lesson else "Select a lesson in the table")
+    with c2:
+        st.button(
+            "Detail",
+            key="lesson_detail",
+            disabled=lesson is None,
+            on_click=show_detail,
+            args=(lesson,),
+        )
+    with c3:
+        if st.button("Do", key="lesson_do", disabled=lesson is None):
+            # The exercise page fetches the content.
+            st.session_state.exercise_lesson = {"lesson_id": lesson.id}
+            st.switch_page("pages/exercise.py")
+
+
+def _facet_label(label: str, key: str, counts: dict[str, int] | None) -> str:
+    return label if counts is None else f"{label} ({counts.get(key, 0)})"
+
+
+def show_list_controls(facets: dict[str, dict[str, int]] | None = None):
+    """The search box, filters and sort of the list. With `facets`, the
+    filters show how many matches each choice leaves."""
+    facets = facets or {}
+    c1, c2, c3, c4, c5 = st.columns([3, 1, 1, 1, 1])
+    with c1:
+        st.text_input(
+            "Search",
+            key="lesson_list_search",
+            help="Words in the name, description, author, text or questions, "
+            "accents optional",
+        )
+    with c2:
+        st.selectbox(
+            "Type",
+            [None] + [t.value for t in LessonType],
+            format_func=lambda t: (
+                "All"
+                if t is None
+                else _facet_label(t.capitalize(), t, facets.get("type"))
+            ),
+            key="lesson_list_type",
+        )
+    with c3:
+        st.selectbox(
+            "Level",
+            [None] + list(Level),
+            format_func=lambda level: (
+                "All"
+                if level is None
+                else _facet_label(
+                    parse_level(level), parse_level(level), facets.get("level")
                 )
-                if do_btn:
-                    st.session_state.exercise_lesson = {
-                        "lesson_id": lesson.id,
-                        "lesson": lesson,
-                    }
-                    st.switch_page("pages/exercise.py")
-
-
-def get_lessons():
-    with get_httpx_client() as client:
-        resp = client.get(build_url("lesson/v1/list"))
-        if resp.status_code == 200:
-            return [Lesson.model_validate(lesson) for lesson in resp.json()]
-        else:
-            return None
+            ),
+            key="lesson_list_level",
+        )
+    with c4:
+        st.selectbox("Sort by", list(SORTS), key="lesson_list_sort")
+    with c5:
+        st.selectbox("Per page", PAGE_SIZES, index=1, key="lesson_list_size")
+
+
+def show_page_navigation(page: LessonPage):
+    state = _list_state()
+    c1, c2, c3 = st.columns([1, 2, 1], vertical_alignment="center")
+    with c1:
+        st.button(
+            "Previous",
+            key="lesson_list_previous",
+            disabled=state["page"] == 0,
+            on_click=_previous_page,
+        )
+    with c2:
+        total = f" of {page.total} lessons" if page.total is not None else ""
+        st.write(f"Page {state['page'] + 1}{total}")
+    with c3:
+        st.button(
+            "Next",
+            key="lesson_list_next",
+            disabled=page.next_cursor is None,
+            on_click=_next_page,
+            args=(page.next_cursor,),
+        )
+
+
+def show_lesson_list(page: LessonPage | None = None):
+    """The current page of the catalog; the next one is prefetched."""
+    if page is None:
+        page = get_lesson_page()
+    if page is None:
+        st.error("Failed to get lessons")
+        page = LessonPage(items=[])
+    elif page.next_cursor is not None and page.facets is None:
+        backend.prefetch(_page_call(page.next_cursor, _list_state()["query"]))
+    show_list_controls(page.facets)
+    show_lesson_table(page.items)
+    show_page_navigation(page)
+
+
+def get_lesson_page():
+    return backend.fetch_concurrently(lesson_page_call())[0]
 
 
 @st.dialog("Detail")
-def show_detail(lesson: Lesson):
+def show_detail(lesson: LessonSummary):
     show_lesson_field("Lesson ID", str(lesson.id))
     show_lesson_field("Lesson Name", str(lesson.name))
     show_lesson_field("Lesson Type", lesson.type.value)
     show_lesson_field("Lesson Level", parse_level(lesson.level))
-    show_lesson_field("Lesson Author", str(lesson.author.name))
+    show_lesson_field("Lesson Author", str(lesson.authorName))
     show_lesson_field("Lesson Created At", parse_datetime(lesson.createdAt))
 
     with st.expander("Lesson Content", expanded=False):
-        show_lesson_content(lesson.content)
+        # The catalog only has summaries; the content is fetched when shown.
+        try:
+            full_lesson = backend.get_lesson(lesson.id)
+        except RuntimeError:
+            st.error("Failed to get lesson content")
+        else:
+            show_lesson_content(full_lesson.content)
 
 
 def parse_datetime(dt: datetime | None):
@@ -117,7 +277,7 @@ def show_lesson_content(content: LessonContent):
                     st.write(f"{i + 1}. {answer}")
     elif isinstance(content, ListeningLessonContent):
         st.write(content.transcript)
-        st.audio(build_audio_url(content.audio_url))
+        lesson_audio(content.audio_url)
         st.write("### Questions")
         for question in content.questions:
             with st.container(border=True):
@@ -1,45 +1,106 @@
+from collections.abc import Awaitable
+import time
+
+import logfire
 import streamlit as st
-from pydantic import BaseModel
 
+from models.user import UserInfo
+from components.infra import backend
+from components.infra.backend.models import UpdateUser
 from settings import get_settings
 
-from utils.network import get_httpx_client
 
+def get_user_email() -> str:
+    email = st.user.get("email")
+    assert isinstance(email, str)
+    return email
 
-class UserInfo(BaseModel):
-    id: int
-    name: str
-    email: str
-    avatarUrl: str
-    is_logged_in: bool
 
+def fetch_user_info(email: str) -> UserInfo | None:
+    try:
+        return backend.get_user(email)
+    except RuntimeError as e:
+        logfire.error("Fetching the user failed", _exc_info=e)
+        return None
 
-def get_user_info(force: bool = True):
-    email = st.user.get("email")
-    assert isinstance(email, str)
-    if force:
-        with get_httpx_client() as client:
-            resp = client.get(
-                f"{get_settings().connection.backend_url.unicode_string()}user/v1/"
-                + email
-            )
-            if resp.status_code == 200:
-                st.session_state.user_info = UserInfo.model_validate(resp.json())
-                return st.session_state.user_info
 
+def remember_user_info(user_info: UserInfo | None) -> UserInfo | None:
+    """Keep a profile the backend returned for this session."""
+    if not user_info:
+        return user_info
+    # The profile kept, while fresh, is answered from the session: nothing was
+    # fetched.
+    if user_info is st.session_state.get("user_info") and _fresh_user_info():
+        return user_info
+    # A profile `get_user` returned is as fresh as the backend's last answer
+    # with it: one served stale during an outage keeps its age, and gives way
+    # to a newer one the session has (from an update, say).
+    fetched_at = backend.client.user_validated_at(user_info)
+    if fetched_at is None:
+        fetched_at = time.monotonic()
+    elif fetched_at < st.session_state.get("user_info_fetched_at", fetched_at):
+        return get_cached_user_info()
+    st.session_state.user_info = user_info
+    st.session_state.user_info_fetched_at = fetched_at
+    return user_info
+
+
+def forget_user_info():
+    st.session_state.pop("user_info", None)
+    st.session_state.pop("user_info_fetched_at", None)
+
+
+def get_cached_user_info() -> UserInfo | None:
+    """The profile this session already has, however old, without a request."""
     user_info = st.session_state.get("user_info", None)
     if user_info:
         return UserInfo.model_validate(user_info)
+    return None
 
-    if not user_info:
-        with get_httpx_client() as client:
-            resp = client.get(
-                f"{get_settings().connection.backend_url.unicode_string()}user/v1/"
-                + email
-            )
-            if resp.status_code == 200:
-                st.session_state.user_info = UserInfo.model_validate(resp.json())
-                return st.session_state.user_info
+
+def _fresh_user_info() -> UserInfo | None:
+    fetched_at = st.session_state.get("user_info_fetched_at", None)
+    if fetched_at is None:
+        return None
+    if time.monotonic() - fetched_at >= get_settings().connection.cache.profile_ttl:
+        return None
+    return get_cached_user_info()
+
+
+async def _cached(user_info: UserInfo) -> UserInfo:
+    return user_info
+
+
+def user_info_call() -> Awaitable[UserInfo | None]:
+    """The profile lookup to pass to `backend.fetch_concurrently`, answered
+    from the session while fresh."""
+    user_info = _fresh_user_info()
+    if user_info:
+        return _cached(user_info)
+    return backend.client.get_user(get_user_email())
+
+
+def get_user_info(force: bool = False):
+    """The signed-in user's profile, requested at most once per
+    `profile_ttl` seconds per session unless `force` is set."""
+    if not force:
+        user_info = _fresh_user_info()
+        if user_info:
+            return user_info
+
+    user_info = remember_user_info(fetch_user_info(get_user_email()))
+    if user_info:
+        return user_info
+
+    return get_cached_user_info()
+
+
+def get_user_avatar() -> str | None:
+    """Avatar URL of the signed-in user, from the session when it has one."""
+    user_info = get_cached_user_info() or get_user_info()
+    if user_info:
+        return user_info.avatarUrl
+    return None
 
 
 def display_user_info():
@@ -90,25 +151,24 @@ def display_user_info():
                 )
             update = st.button("Update")
             if update:
-                with get_httpx_client() as client:
-                    resp = client.post(
-                        f"{get_settings().connection.backend_url.unicode_string()}user/v1/update",
-                        json={
-                            "id": user_info.id,
-                            "name": new_name,
-                            "email": new_email,
-                            "avatarUrl": user_info.avatarUrl,
-                            "is_logged_in": True,
-                        },
+                try:
+                    updated = backend.update_user(
+                        UpdateUser(
+                            id=user_info.id,
+                            name=new_name,
+                            email=new_email,
+                            avatarUrl=user_info.avatarUrl,
+                            is_logged_in=True,
+                        )
                     )
-                    if resp.status_code == 200:
-                        st.session_state.edit_user_info = False
-                        get_user_info(force=True)
-                        st.session_state.edit_user_info_status = "successful"
-                    else:
-                        print(resp.text)
-                        st.session_state.edit_user_info = False
-                        st.session_state.edit_user_info_status = "failed"
+                except RuntimeError as e:
+                    logfire.error("Updating the user failed", _exc_info=e)
+                    st.session_state.edit_user_info = False
+                    st.session_state.edit_user_info_status = "failed"
+                else:
+                    st.session_state.edit_user_info = False
+                    remember_user_info(updated)
+                    st.session_state.edit_user_info_status = "successful"
                 st.switch_page("pages/account.py")
     else:
         st.error("Failed to get user info")
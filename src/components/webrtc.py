@@ -1,60 +1,19 @@
 import queue
-import av
-import numpy as np
 import pydub
 import streamlit as st
 import tempfile
 from streamlit_webrtc import WebRtcMode, webrtc_streamer
 
-import httpx
-
 from components.sidebar import make_sidebar
+from components.infra import backend
+from utils.audio import process_audio_frame
 
 
 def transcribe(audio_segment: pydub.AudioSegment):
     with tempfile.NamedTemporaryFile(dir=".temp", suffix=".wav") as f:
         audio_segment.export(f.name, format="wav")
-        with httpx.Client(timeout=None) as client:
-            data = f.read()
-            print(data)
-            response = client.post(
-                "http://localhost:8000/resources/v1/audio/text",
-                content=data,
-            )
-            return response.json()["transcript"]
-
-
-def frame_energy(frame: av.AudioFrame):
-    samples = np.frombuffer(frame.to_ndarray().tobytes(), dtype=np.int16)
-    return np.sqrt(np.mean(samples**2))
-
-
-def add_frame_to_chunk(sound_chunk: pydub.AudioSegment, audio_frame: av.AudioFrame):
-    sound = pydub.AudioSegment(
-        data=audio_frame.to_ndarray().tobytes(),
-        sample_width=audio_frame.format.bytes,
-        frame_rate=audio_frame.sample_rate,
-        channels=len(audio_frame.layout.channels),
-    )
-    sound_chunk += sound
-    return sound_chunk
-
-
-def process_audio_frame(
-    audio_frames: list[av.AudioFrame],
-    sound_chunk: pydub.AudioSegment,
-    silence_frames: int,
-    enery_threshold: int,
-):
-    for audio_frame in audio_frames:
-        sound_chunk = add_frame_to_chunk(sound_chunk, audio_frame)
-
-        energy = frame_energy(audio_frame)
-        if energy < enery_threshold:
-            silence_frames += 1
-        else:
-            silence_frames = 0
-    return sound_chunk, silence_frames
+        data = f.read()
+        return backend.transcribe_audio(data)
 
 
 def handle_silenece(
@@ -82,15 +41,10 @@ def handle_queue_empty(sound_chunk, text_output):
 
 
 def synthesize_response(text: str):
-    with httpx.Client(timeout=None) as client:
-        response = client.post(
-            "http://localhost:8000/resources/v1/audio/convert",
-            json={"transcript": text},
-        )
-        uid = response.json()["uid"]
-        audio_url = f"http://localhost:8000/resources/v1/audio/{uid}"
-        audio_resp = client.get(audio_url)
-        return audio_resp.content
+    # Both steps are cached: the same text is converted once, and its audio
+    # is read from the local audio cache.
+    uid = backend.convert_audio(text)
+    return backend.get_lesson_audio(uid).path.read_bytes()
 
 
 def sst(
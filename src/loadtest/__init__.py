@@ -0,0 +1,14 @@
+"""Load test of the UI against the stand-in backend.
+
+Runs many scripted sessions (login, lesson list, exercise, assistant chat,
+grading) with ``streamlit.testing.v1.AppTest`` and reports rerun latency
+percentiles per step, backend calls per rerun and memory per session.
+Needs ``uvicorn`` to serve the stand-in, from the ``loadtest`` dependency
+group (``uv sync --group loadtest``). From ``src``::
+
+    python -m loadtest --sessions 50 --concurrency 8 --latency 0.05
+"""
+
+from .driver import LoadReport, ScriptedSession, run_load
+
+__all__ = ["LoadReport", "ScriptedSession", "run_load"]
@@ -0,0 +1,64 @@
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest",
+        description="Drive scripted UI sessions against the stand-in backend.",
+    )
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--lessons", type=int, default=50, help="lessons in the catalog"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="seconds per lookup/write call"
+    )
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=0.5,
+        help="seconds per generate/grade/chat/audio call",
+    )
+    parser.add_argument(
+        "--token-delay", type=float, default=0.0, help="seconds between chat tokens"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per rerun")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOGFIRE_SEND_TO_LOGFIRE", "false")
+    os.environ.setdefault("LOGFIRE_CONSOLE", "false")
+
+    from standin import StandinBackend
+
+    from .driver import run_load
+
+    backend = StandinBackend(
+        lessons=args.lessons,
+        latency={
+            "lookup": args.latency,
+            "write": args.latency,
+            "generate": args.llm_latency,
+            "grade": args.llm_latency,
+            "chat": args.llm_latency,
+            "audio": args.llm_latency,
+        },
+        error_rate=args.error_rate,
+        token_delay=args.token_delay,
+        seed=args.seed,
+    )
+    report = run_load(
+        backend,
+        sessions=args.sessions,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+from dataclasses import dataclass, field
+import gc
+import os
+from pathlib import Path
+import random
+import resource
+import socket
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from streamlit import config
+from streamlit.runtime import Runtime
+from streamlit.runtime.pages_manager import PagesManager
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test, local_script_runner
+
+from standin import StandinBackend
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+# The user the scripted session of each thread logs in as.
+_session_user = threading.local()
+
+
+class _KeepFirstInstance(type):
+    def __setattr__(cls, name, value):
+        if name != "_instance":
+            super().__setattr__(name, value)
+        elif value is not None and Runtime._instance is None:
+            Runtime._instance = value
+
+
+class _SharedRuntime(Runtime, metaclass=_KeepFirstInstance):
+    pass
+
+
+def _patch_app_test():
+    """Let scripted sessions run at once, in threads of one process.
+
+    AppTest runs every script as the same anonymous user; each session sets
+    its own user for its thread instead. AppTest also overrides config
+    options around each run by swapping `config.get_option`, which sessions
+    running at once would restore under each other, so the options are set
+    once for the process. It resets `PagesManager.uses_pages_directory`
+    before each run too, which a script running meanwhile reads to find the
+    pages; the reset goes to a subclass of AppTest's own. And it installs a
+    mocked `Runtime` before each run and removes it after, under the scripts
+    of other sessions; the first one is kept instead, and shared by all
+    sessions like the runtime of a server.
+    """
+    original = local_script_runner.LocalScriptRunner.__init__
+    if getattr(original, "_patched", False):
+        return
+
+    def __init__(self, *args, **kwargs):
+        original(self, *args, **kwargs)
+        user_info = getattr(_session_user, "info", None)
+        if user_info is not None:
+            self._user_info = user_info
+
+    @contextlib.contextmanager
+    def patch_config_options(options):
+        for key, value in options.items():
+            if config.get_option(key) != value:
+                config.set_option(key, value)
+        yield
+
+    __init__._patched = True
+    local_script_runner.LocalScriptRunner.__init__ = __init__
+    app_test.patch_config_options = patch_config_options
+    app_test.PagesManager = type("PagesManager", (PagesManager,), {})
+    app_test.Runtime = _SharedRuntime
+
+
+@dataclass(slots=True)
+class Rerun:
+    step: str
+    seconds: float
+    backend_calls: int = 0
+
+
+@dataclass
+class SessionResult:
+    email: str
+    reruns: list[Rerun] = field(default_factory=list)
+    error: str | None = None
+    memory: int = 0
+
+
+class ScriptedSession:
+    """
+    One student going through login, the lesson list, an exercise, the
+    assistant chat and grading, one rerun per interaction. A rerun that
+    raises fails the session.
+
+    Args:
+        index (int): Session number, used for the student's email.
+        lesson_ids (list[int]): Lessons with questions to pick from.
+        timeout (float): Seconds a single rerun may take.
+        seed (int | None): Seed for the lesson and answers picked.
+        backend_calls (Callable[[], int] | None): Running count of calls the
+            backend served, to attribute calls to reruns. Only meaningful
+            when nothing else talks to the backend.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        lesson_ids: list[int],
+        timeout: float = 60.0,
+        seed: int | None = None,
+        backend_calls: Callable[[], int] | None = None,
+    ):
+        self.email = f"loadtest{index}@example.com"
+        self.lesson_ids = lesson_ids
+        self.backend_calls = backend_calls or (lambda: 0)
+        self.result = SessionResult(self.email)
+        self._random = random.Random(seed)
+        self.app = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+
+    def rerun(self, step: str, action: Callable[[], AppTest] | None = None):
+        calls = self.backend_calls()
+        start = time.perf_counter()
+        (action or self.app.run)()
+        seconds = time.perf_counter() - start
+        self.result.reruns.append(Rerun(step, seconds, self.backend_calls() - calls))
+        if self.app.exception:
+            raise RuntimeError(f"{step}: {self.app.exception[0].value}")
+
+    def button(self, label: str):
+        return next(b for b in self.app.button if b.label == label)
+
+    def run(self) -> SessionResult:
+        _patch_app_test()
+        _session_user.info = {
+            "email": self.email,
+            "name": self.email.split("@")[0],
+            "is_logged_in": True,
+        }
+        try:
+            self.script()
+        except Exception as e:
+            self.result.error = repr(e)
+        finally:
+            _session_user.info = None
+        return self.result
+
+    def script(self):
+        app = self.app
+        self.rerun("login")
+
+        app.switch_page("pages/lesson.py")
+        self.rerun("lessons")
+
+        # Only the first page of the catalog is listed. AppTest cannot click
+        # a table row, so select it the way the row selection handler does.
+        listed = set(app.dataframe[0].value["Id"])
+        lesson_id = self._random.choice([i for i in self.lesson_ids if i in listed])
+        app.session_state["lesson_list"]["selected"] = lesson_id
+        self.rerun("select lesson", app.run)
+        self.rerun("open exercise", app.button(key="lesson_do").click().run)
+        # The page switch happened inside the script; AppTest stays on the
+        # page it was told to run unless switched explicitly.
+        app.switch_page("pages/exercise.py")
+
+        for selectbox in app.selectbox:
+            selectbox.select(self._random.randrange(len(selectbox.options)))
+        self.rerun("answer")
+
+        self.rerun("open assistant", self.button("Assistant").click().run)
+        self.rerun("chat", self.button("Assistant").click().run)
+        self.rerun("answer")
+
+        self.rerun("turn in", self.button("Turn in").click().run)
+        app.switch_page("pages/grade.py")
+        self.rerun("grade")
+        # Any interaction on the result page reruns it.
+        self.rerun("review grade")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile, `q` in [0, 1]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def serve(backend: StandinBackend) -> str:
+    """Serve the stand-in over HTTP from a background thread, returning its URL."""
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(
+            backend, host="127.0.0.1", port=port, log_level="warning", access_log=False
+        )
+    )
+    threading.Thread(target=server.run, name="standin", daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/"
+
+
+def probe(
+    backend: StandinBackend, lesson_ids: list[int], timeout: float, seed: int | None
+) -> tuple[SessionResult, SessionResult]:
+    """Run two sessions alone, counting exactly which rerun made which backend
+    calls. The first finds the process-wide caches empty (cold), the second
+    finds them as the first left them (warm) and measures the memory it keeps
+    alive (session state, widgets, cached objects).
+    """
+    cold = ScriptedSession(-1, lesson_ids, timeout, seed, backend.calls.total).run()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    warm = ScriptedSession(0, lesson_ids, timeout, seed, backend.calls.total).run()
+    gc.collect()
+    warm.memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return cold, warm
+
+
+def _rss() -> int:
+    """Resident memory of this process in bytes, 0 where unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+
+def _shared_counters() -> Counter[str]:
+    """Counters of the network layer all sessions share."""
+    from utils import network
+
+    counts = Counter(network.get_single_flight_stats())
+    counts.update(network.get_cache_stats())
+    for stats in network.get_ttl_cache_stats().values():
+        counts.update({f"ttl_{k}": stats[k] for k in ("hit", "stale", "miss")})
+    for stats in network.get_bulkhead_stats().values():
+        counts["bulkhead_rejected"] += stats["rejected"]
+    return counts
+
+
+@dataclass
+class LoadReport:
+    sessions: int
+    concurrency: int
+    seconds: float
+    results: list[SessionResult]
+    cold: SessionResult
+    warm: SessionResult
+    backend_calls: Counter[str]
+    shared: Counter[str]
+    rss_before: int
+    max_rss: int
+
+    def format(self) -> str:
+        reruns = [r for result in self.results for r in result.reruns]
+        failed = [result for result in self.results if result.error]
+        lines = [
+            f"{self.sessions} sessions, {self.concurrency} at a time in one "
+            f"process, {self.seconds:.1f}s "
+            f"({self.sessions / self.seconds:.2f} sessions/s)",
+            f"failed sessions: {len(failed)}",
+            "",
+            f"{'step':<16}{'reruns':>8}{'p50 ms':>10}{'p90 ms':>10}"
+            f"{'p99 ms':>10}{'max ms':>10}{'cold*':>8}{'warm*':>8}",
+        ]
+        probe_calls: dict[str, dict[str, list[int]]] = {}
+        for name, probe_result in (("cold", self.cold), ("warm", self.warm)):
+            for r in probe_result.reruns:
+                calls = probe_calls.setdefault(r.step, {"cold": [], "warm": []})
+                calls[name].append(r.backend_calls)
+        steps = list(dict.fromkeys(r.step for r in reruns))
+        for step in [*steps, "all"]:
+            times = [r.seconds * 1000 for r in reruns if step in ("all", r.step)]
+            calls = {
+                name: [
+                    c
+                    for s, by_probe in probe_calls.items()
+                    if step in ("all", s)
+                    for c in by_probe[name]
+                ]
+                for name in ("cold", "warm")
+            }
+            lines.append(
+                f"{step:<16}{len(times):>8}{percentile(times, .5):>10.1f}"
+                f"{percentile(times, .9):>10.1f}{percentile(times, .99):>10.1f}"
+                f"{max(times, default=0):>10.1f}"
+                + "".join(f"{sum(cs) / max(len(cs), 1):>8.2f}" for cs in calls.values())
+            )
+        groups = ", ".join(f"{g}={n}" for g, n in sorted(self.backend_calls.items()))
+        shared = self.shared
+        growth = max(self.max_rss - self.rss_before, 0)
+        lines += [
+            "",
+            "* backend calls per rerun, measured on a session run alone, first "
+            "on empty caches (cold), then on the caches it left (warm)",
+            f"backend calls per rerun under load: "
+            f"{self.backend_calls.total() / max(len(reruns), 1):.2f} ({groups})",
+            f"shared under load: {shared['coalesced']} GETs joined one in flight "
+            f"({shared['upstream']} sent), TTL cache {shared['ttl_hit']} hits, "
+            f"{shared['ttl_stale']} stale, {shared['ttl_miss']} misses, "
+            f"{shared['revalidated']} revalidated (304), "
+            f"{shared['stale_served']} stale served, "
+            f"{shared['bulkhead_rejected']} rejected by bulkheads",
+            f"memory kept per session: {self.warm.memory / 1024:.0f} KiB, "
+            f"RSS {self.rss_before / 2**20:.0f} MiB before the load, peak "
+            f"{self.max_rss / 2**20:.0f} MiB "
+            f"(+{growth / 2**20 / max(self.concurrency, 1):.1f} MiB per "
+            f"concurrent session)",
+        ]
+        for result in failed[:5]:
+            lines.append(f"{result.email}: {result.error}")
+        return "\n".join(lines)
+
+
+def run_load(
+    backend: StandinBackend,
+    sessions: int = 20,
+    concurrency: int = 10,
+    timeout: float = 60.0,
+    seed: int | None = None,
+) -> LoadReport:
+    """Run `sessions` scripted sessions, `concurrency` of them at a time.
+
+    The sessions run in threads of this process, as they would in one
+    frontend instance: they share its network layer (connection pool,
+    coalescing, caches, breakers, bulkheads), against one stand-in served
+    over HTTP. The disk caches start empty, in a temporary directory. Two
+    sessions run alone first, see `probe`. Must be called before the network
+    layer or settings are first used in this process.
+    """
+    os.environ["CONNECTION__BACKEND_URL"] = serve(backend)
+    cache_dir = Path(tempfile.mkdtemp(prefix="loadtest-"))
+    for cache in ("audio", "tts", "generation"):
+        os.environ[f"CONNECTION__CACHE__{cache.upper()}__DIRECTORY"] = str(
+            cache_dir / cache
+        )
+    lesson_ids = [
+        i for i, lesson in backend.lessons.items() if "questions" in lesson["content"]
+    ]
+    cold, warm = probe(backend, lesson_ids, timeout, seed)
+
+    calls_before = Counter(backend.calls)
+    shared_before = _shared_counters()
+    gc.collect()
+    rss_before = _rss()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="session") as pool:
+        futures = [
+            pool.submit(
+                ScriptedSession(
+                    i, lesson_ids, timeout, None if seed is None else seed + i
+                ).run
+            )
+            for i in range(1, sessions + 1)
+        ]
+        results = [future.result() for future in futures]
+    seconds = time.perf_counter() - start
+    return LoadReport(
+        sessions=sessions,
+        concurrency=concurrency,
+        seconds=seconds,
+        results=results,
+        cold=cold,
+        warm=warm,
+        backend_calls=Counter(backend.calls) - calls_before,
+        shared=_shared_counters() - shared_before,
+        rss_before=rss_before,
+        # Kilobytes on Linux.
+        max_rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    )
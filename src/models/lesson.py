@@ -1,6 +1,12 @@
 from datetime import datetime
 from typing import Annotated
-from pydantic import BaseModel, field_validator, ValidationInfo, BeforeValidator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    field_validator,
+    ValidationInfo,
+    BeforeValidator,
+)
 from enum import Enum
 
 from .user import UserInfo
@@ -55,33 +61,43 @@ def parse_level_inv(level: str):
 
 
 class MultipleChoicesQuestion(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     index: int
     question: str
-    answers: list[str]
+    answers: tuple[str, ...]
     correct_answer: int
 
 
 class SpeakingLessonContent(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     topic: str
     main_question: str
-    guidelines: list[str]
+    guidelines: tuple[str, ...]
 
 
 class ListeningLessonContent(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     transcript: str
     audio_url: str = ""
-    questions: list[MultipleChoicesQuestion]
+    questions: tuple[MultipleChoicesQuestion, ...]
 
 
 class ReadingLessonContent(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     text: str
-    questions: list[MultipleChoicesQuestion]
+    questions: tuple[MultipleChoicesQuestion, ...]
 
 
 LessonContent = SpeakingLessonContent | ListeningLessonContent | ReadingLessonContent
 
 
 class Lesson(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: int
     name: str
     description: str
@@ -106,3 +122,43 @@ class Lesson(BaseModel):
                 return SpeakingLessonContent.model_validate(v)
             case _:
                 raise ValueError(f"Invalid lesson type: {vals['type']}")
+
+
+class LessonSummary(BaseModel):
+    """What the catalog shows of a lesson, without its content; see
+    `Lesson` for the rest."""
+
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    name: str
+    description: str
+    type: LessonType
+    level: Level
+    authorName: str
+    createdAt: Annotated[
+        datetime,
+        BeforeValidator(validate_datetime_format),
+    ]
+
+    @classmethod
+    def of(cls, lesson: Lesson) -> "LessonSummary":
+        return cls(
+            id=lesson.id,
+            name=lesson.name,
+            description=lesson.description,
+            type=lesson.type,
+            level=lesson.level,
+            authorName=lesson.author.name,
+            createdAt=lesson.createdAt,
+        )
+
+
+class LessonPage(BaseModel):
+    """One page of the catalog; `next_cursor` asks for the page after it.
+    Search results also count the matches by `type` and `level` (`facets`)."""
+
+    items: list[LessonSummary]
+    next_cursor: str | None = None
+    total: int | None = None
+    facets: dict[str, dict[str, int]] | None = None
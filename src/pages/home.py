@@ -2,8 +2,6 @@ import uuid
 import streamlit as st
 from streamlit_elements import elements, mui, html
 from components import sidebar
-from settings import get_settings
-from utils.network import get_httpx_client
 from components.chat import chat_sidebar
 from components.user import get_user_info, UserInfo
 
@@ -10,13 +10,17 @@ from components.lesson import (
     create_lesson,
 )
 
-from components.lessons.list_lessons import show_detail
+from components.lessons.list_lessons import (
+    lesson_page_call,
+    show_detail,
+    show_lesson_list,
+)
 
 
-from utils.visualize import paginate_df, filter_dataframe
-from utils.network import get_httpx_client
+from components.infra import backend
+from components.user import remember_user_info, user_info_call
 
-from settings import get_settings
+from utils.visualize import paginate_df, filter_dataframe
 
 st.set_page_config(
     page_title="Lessons",
@@ -28,13 +32,19 @@ st.set_page_config(
 st.title("📜 Lessons")
 sidebar()
 
+# The profile (needed to upload) and the shown page of the catalog are
+# independent lookups.
+user_info, lesson_page = backend.fetch_concurrently(
+    user_info_call(),
+    lesson_page_call(),
+)
+remember_user_info(user_info)
+
 
 lesson_tab, create_lesson_tab = st.tabs(["Lessons", "Create lesson"])
 
 with lesson_tab:
-    from components.lessons.list_lessons import show_lesson_list
-
-    show_lesson_list()
+    show_lesson_list(lesson_page)
 
 with create_lesson_tab:
     create_lesson()
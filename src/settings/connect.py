@@ -1,5 +1,125 @@
+from pathlib import Path
+import tempfile
+from typing import Literal
+
 from pydantic import BaseModel, HttpUrl
 
 
+class PoolSettings(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+
+class TimeoutProfile(BaseModel):
+    connect: float = 3.0
+    read: float = 10.0
+    write: float = 10.0
+    pool: float = 5.0
+
+
+class TimeoutSettings(BaseModel):
+    lookup: TimeoutProfile = TimeoutProfile(connect=2.0, read=5.0, pool=2.0)
+    write: TimeoutProfile = TimeoutProfile(read=20.0, write=20.0)
+    llm: TimeoutProfile = TimeoutProfile(read=180.0, write=30.0, pool=10.0)
+    audio: TimeoutProfile = TimeoutProfile(read=60.0, write=60.0, pool=10.0)
+
+
+class RetrySettings(BaseModel):
+    attempts: int = 3
+    backoff: float = 0.2
+    max_backoff: float = 2.0
+
+
+class HedgeSettings(BaseModel):
+    enabled: bool = False
+    percentile: float = 0.95
+    min_samples: int = 20
+    min_delay: float = 0.05
+
+
+class BreakerSettings(BaseModel):
+    window: float = 30.0
+    min_calls: int = 10
+    failure_rate: float = 0.5
+    open_for: float = 15.0
+    half_open_calls: int = 1
+
+
+class TTLCacheProfile(BaseModel):
+    ttl: float
+    stale_for: float = 0.0
+    beta: float = 1.0
+
+
+class AudioCacheSettings(BaseModel):
+    directory: Path = Path(tempfile.gettempdir()) / "lesson-audio"
+    max_bytes: int = 512 * 1024 * 1024
+    codec: Literal["opus", "mp3", "original"] = "opus"
+    bitrate: str = "48k"
+
+
+class TTSMemoSettings(BaseModel):
+    directory: Path = Path(tempfile.gettempdir()) / "tts-memo"
+    ttl: float = 7 * 24 * 3600.0
+    max_bytes: int = 16 * 1024 * 1024
+
+
+class GenerationCacheSettings(BaseModel):
+    directory: Path = Path(tempfile.gettempdir()) / "lesson-generation"
+    max_bytes: int = 64 * 1024 * 1024
+
+
+class CacheSettings(BaseModel):
+    max_entries: int = 1024
+    catalog: TTLCacheProfile = TTLCacheProfile(ttl=30.0, stale_for=300.0)
+    grade: TTLCacheProfile = TTLCacheProfile(ttl=600.0, beta=0.0)
+    lesson_pages: TTLCacheProfile = TTLCacheProfile(ttl=30.0, stale_for=120.0)
+    # Full lessons by id; uploads add lessons, they never change one.
+    lesson_detail: TTLCacheProfile = TTLCacheProfile(ttl=300.0, stale_for=3600.0)
+    profile_ttl: float = 60.0
+    lessons: int = 2048
+    audio: AudioCacheSettings = AudioCacheSettings()
+    tts: TTSMemoSettings = TTSMemoSettings()
+    generation: GenerationCacheSettings = GenerationCacheSettings()
+
+
+class BulkheadLimit(BaseModel):
+    limit: int
+    queue_timeout: float
+
+
+class BulkheadSettings(BaseModel):
+    lookup: BulkheadLimit = BulkheadLimit(limit=50, queue_timeout=5.0)
+    write: BulkheadLimit = BulkheadLimit(limit=20, queue_timeout=10.0)
+    generate: BulkheadLimit = BulkheadLimit(limit=4, queue_timeout=60.0)
+    grade: BulkheadLimit = BulkheadLimit(limit=8, queue_timeout=60.0)
+    chat: BulkheadLimit = BulkheadLimit(limit=16, queue_timeout=30.0)
+    audio: BulkheadLimit = BulkheadLimit(limit=8, queue_timeout=30.0)
+
+
+class CompressionSettings(BaseModel):
+    mode: Literal["negotiate", "always", "off"] = "negotiate"
+    algorithm: Literal["zstd", "gzip"] = "zstd"
+    min_size: int = 1024
+    disabled_groups: list[str] = []
+
+
+class RerunSettings(BaseModel):
+    memo: bool = True
+    check: Literal["off", "log", "raise"] = "off"
+    max_calls: int = 8
+
+
 class ConnectionSettings(BaseModel):
     backend_url: HttpUrl
+    pool: PoolSettings = PoolSettings()
+    timeouts: TimeoutSettings = TimeoutSettings()
+    retry: RetrySettings = RetrySettings()
+    hedge: HedgeSettings = HedgeSettings()
+    breaker: BreakerSettings = BreakerSettings()
+    cache: CacheSettings = CacheSettings()
+    bulkheads: BulkheadSettings = BulkheadSettings()
+    compression: CompressionSettings = CompressionSettings()
+    rerun: RerunSettings = RerunSettings()
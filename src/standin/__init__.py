@@ -0,0 +1,20 @@
+"""Local stand-in for the backend API.
+
+Serve it with any ASGI server (``uvicorn standin:app``) and point
+``CONNECTION__BACKEND_URL`` at it, or route the network layer to it in
+process::
+
+    from standin import StandinBackend
+    from utils.network import use_transport
+
+    use_transport(httpx.ASGITransport(app=StandinBackend()))
+
+Latency and failures can be injected with ``StandinBackend(latency=...,
+error_rate=...)``; ``python -m loadtest`` drives the UI against it.
+"""
+
+from .app import StandinBackend
+
+app = StandinBackend()
+
+__all__ = ["StandinBackend", "app"]
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections.abc import AsyncIterator, Awaitable, Callable
+from collections import Counter
+from datetime import datetime
+from email.utils import formatdate
+import gzip
+import hashlib
+import json
+import random
+import re
+from typing import Any
+from urllib.parse import parse_qsl
+import uuid
+
+from utils.compression import available_encodings
+
+from .data import (
+    make_generated,
+    make_grade,
+    make_lesson,
+    make_reply,
+    make_user,
+    make_wav,
+    summarize,
+)
+
+Handler = Callable[..., Awaitable[tuple[int, Any]]]
+
+
+class StandinBackend:
+    """
+    In-memory stand-in for the backend API, as a plain ASGI application.
+
+    JSON GET responses carry an `ETag` and `Last-Modified`, and matching
+    conditional requests get `304 Not Modified`, like the real backend.
+    Compressed request bodies are accepted (and advertised with
+    `Accept-Encoding`), and large responses are gzipped when the client
+    asks for it.
+
+    GET handlers get the query parameters as their body. `lesson/v1/page`
+    pages through the catalog with an opaque keyset cursor, sorted by `id`,
+    `name` or `createdAt` (`-` for descending) and filtered by `type`,
+    `level` and a `q` substring of the name or description. It and
+    `lesson/v1/list` return lesson summaries with `view=summary`.
+
+    Every route belongs to an endpoint group (`lookup`, `write`, `generate`,
+    `grade`, `chat`, `audio`), which is what latency is configured by.
+    Requests served are counted per group in `calls`.
+
+    Args:
+        lessons (int): Number of generated lessons in the catalog.
+        latency (float | dict[str, float]): Seconds each response is delayed,
+            either for all groups or per group. Chat streams are delayed
+            before the first token and by `token_delay` between tokens.
+        error_rate (float): Share of requests answered with `503`.
+        token_delay (float): Seconds between streamed chat tokens.
+        seed (int | None): Seed for error injection, for repeatable runs.
+    """
+
+    def __init__(
+        self,
+        lessons: int = 20,
+        latency: float | dict[str, float] = 0.0,
+        error_rate: float = 0.0,
+        token_delay: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.token_delay = token_delay
+        self.calls: Counter[str] = Counter()
+        self.audio: dict[str, bytes] = {}
+        self._random = random.Random(seed)
+        self.users: dict[str, dict[str, Any]] = {}
+        self.lessons: dict[int, dict[str, Any]] = {
+            i: make_lesson(i) for i in range(1, lessons + 1)
+        }
+        self.modified = formatdate(usegmt=True)
+        self.routes: list[tuple[str, re.Pattern[str], str, Handler]] = [
+            ("GET", re.compile(r"^/lesson/v1/list$"), "lookup", self.list_lessons),
+            ("GET", re.compile(r"^/lesson/v1/page$"), "lookup", self.lesson_page),
+            (
+                "GET",
+                re.compile(r"^/lesson/v1/(?P<lesson_id>\d+)$"),
+                "lookup",
+                self.get_lesson,
+            ),
+            (
+                "GET",
+                re.compile(r"^/user/v1/(?P<email>[^/]+)$"),
+                "lookup",
+                self.get_user,
+            ),
+            ("POST", re.compile(r"^/user/v1/create$"), "write", self.create_user),
+            ("POST", re.compile(r"^/user/v1/update$"), "write", self.update_user),
+            ("POST", re.compile(r"^/lesson/v1/upload$"), "write", self.upload_lesson),
+            (
+                "POST",
+                re.compile(r"^/lesson/v1/generate$"),
+                "generate",
+                self.generate_lesson,
+            ),
+            ("POST", re.compile(r"^/exercise/v1/grade$"), "grade", self.grade),
+            ("POST", re.compile(r"^/chat/v1/stream$"), "chat", self.stream_chat),
+            (
+                "POST",
+                re.compile(r"^/resources/v1/audio/convert$"),
+                "audio",
+                self.convert_audio,
+            ),
+            (
+                "POST",
+                re.compile(r"^/resources/v1/audio/text$"),
+                "audio",
+                self.transcribe_audio,
+            ),
+            (
+                "GET",
+                re.compile(r"^/resources/v1/audio/(?P<uid>[^/]+)$"),
+                "audio",
+                self.get_audio,
+            ),
+        ]
+
+    def touch(self):
+        """Mark the data as changed so validators stop matching."""
+        self.modified = formatdate(usegmt=True)
+
+    def delay(self, group: str) -> float:
+        if isinstance(self.latency, dict):
+            return self.latency.get(group, 0.0)
+        return self.latency
+
+    async def list_lessons(self, params: dict[str, str]) -> tuple[int, Any]:
+        lessons = list(self.lessons.values())
+        if params.get("view") == "summary":
+            lessons = [summarize(lesson) for lesson in lessons]
+        return 200, lessons
+
+    async def lesson_page(self, params: dict[str, str]) -> tuple[int, Any]:
+        sort = params.get("sort", "id")
+        field, descending = sort.lstrip("-"), sort.startswith("-")
+        if field not in ("id", "name", "createdAt"):
+            return 400, {"detail": f"Cannot sort by {sort}"}
+        limit = max(1, min(int(params.get("limit", 20)), 100))
+        query = params.get("q", "").casefold()
+        lessons = [
+            lesson
+            for lesson in self.lessons.values()
+            if params.get("type") in (None, lesson["type"])
+            and params.get("level") in (None, str(lesson["level"]))
+            and (
+                query in lesson["name"].casefold()
+                or query in lesson["description"].casefold()
+            )
+        ]
+
+        def key(lesson):
+            return [lesson[field], lesson["id"]]
+
+        lessons.sort(key=key, reverse=descending)
+        total = len(lessons)
+        if "cursor" in params:
+            after = json.loads(base64.urlsafe_b64decode(params["cursor"]))
+            lessons = [
+                lesson
+                for lesson in lessons
+                if (key(lesson) < after if descending else key(lesson) > after)
+            ]
+        items = lessons[:limit]
+        next_cursor = None
+        if len(lessons) > limit:
+            next_cursor = base64.urlsafe_b64encode(
+                json.dumps(key(items[-1])).encode()
+            ).decode()
+        if params.get("view") == "summary":
+            items = [summarize(lesson) for lesson in items]
+        return 200, {"items": items, "next_cursor": next_cursor, "total": total}
+
+    async def get_lesson(self, body: Any, lesson_id: str) -> tuple[int, Any]:
+        lesson = self.lessons.get(int(lesson_id))
+        if lesson is None:
+            return 404, {"detail": "Lesson not found"}
+        return 200, lesson
+
+    async def get_user(self, body: Any, email: str) -> tuple[int, Any]:
+        user = self.users.get(email)
+        if user is None:
+            return 404, {"detail": "User not found"}
+        return 200, user
+
+    async def create_user(self, body: Any) -> tuple[int, Any]:
+        user = make_user(len(self.users) + 1) | body
+        self.users[user["email"]] = user
+        self.touch()
+        return 200, user
+
+    async def update_user(self, body: Any) -> tuple[int, Any]:
+        for email, user in list(self.users.items()):
+            if user["id"] == body.get("id"):
+                del self.users[email]
+                self.users[body["email"]] = user | body
+                self.touch()
+                return 200, self.users[body["email"]]
+        return 404, {"detail": "User not found"}
+
+    async def upload_lesson(self, body: Any) -> tuple[int, Any]:
+        data = body["data"]
+        lesson_id = max(self.lessons, default=0) + 1
+        author = next(
+            (u for u in self.users.values() if u["id"] == data.get("authorId")),
+            make_user(data.get("authorId", 1)),
+        )
+        self.lessons[lesson_id] = {
+            "id": lesson_id,
+            "name": data["name"],
+            "description": data["description"],
+            "type": data["type"],
+            "level": data["level"],
+            "author": author,
+            "createdAt": datetime.now().isoformat(timespec="seconds"),
+            "content": data["content"],
+        }
+        self.touch()
+        return 200, self.lessons[lesson_id]
+
+    async def generate_lesson(self, body: Any) -> tuple[int, Any]:
+        return 200, {"content": make_generated(body)}
+
+    async def grade(self, body: Any) -> tuple[int, Any]:
+        return 200, make_grade(body)
+
+    async def stream_chat(self, body: Any) -> tuple[int, Any]:
+        async def tokens() -> AsyncIterator[bytes]:
+            for token in make_reply():
+                if self.token_delay:
+                    await asyncio.sleep(self.token_delay)
+                yield token.encode()
+
+        return 200, tokens()
+
+    async def convert_audio(self, body: Any) -> tuple[int, Any]:
+        uid = uuid.uuid4().hex
+        seconds = min(len(body["transcript"].split()) / 3, 30.0)
+        self.audio[uid] = make_wav(seconds)
+        return 200, {"uid": uid}
+
+    async def transcribe_audio(self, body: Any) -> tuple[int, Any]:
+        return 200, {"transcript": "I like to visit the river market."}
+
+    async def get_audio(self, body: Any, uid: str) -> tuple[int, Any]:
+        audio = self.audio.get(uid)
+        if audio is None:
+            return 404, {"detail": "Audio not found"}
+        return 200, audio
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        headers = {k.decode().lower(): v.decode() for k, v in scope["headers"]}
+        encoding = headers.get("content-encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "zstd":
+            import zstandard
+
+            body = zstandard.ZstdDecompressor().decompress(body)
+
+        status, payload = 404, {"detail": "Not found"}
+        for method, pattern, group, handler in self.routes:
+            match = pattern.match(scope["path"])
+            if match and scope["method"] == method:
+                self.calls[group] += 1
+                if self.delay(group):
+                    await asyncio.sleep(self.delay(group))
+                if self._random.random() < self.error_rate:
+                    status, payload = 503, {"detail": "Injected failure"}
+                    break
+                if method == "GET":
+                    body = dict(parse_qsl(scope["query_string"].decode()))
+                elif "json" in headers.get("content-type", ""):
+                    body = json.loads(body) if body else None
+                status, payload = await handler(body, **match.groupdict())
+                break
+
+        response_headers = [
+            (b"accept-encoding", ", ".join(sorted(available_encodings())).encode()),
+        ]
+        if isinstance(payload, AsyncIterator):
+            response_headers.append((b"content-type", b"text/plain; charset=utf-8"))
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": status,
+                    "headers": response_headers,
+                }
+            )
+            async for chunk in payload:
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if isinstance(payload, bytes):
+            raw = payload
+            response_headers.append((b"content-type", b"audio/wav"))
+        else:
+            raw = json.dumps(payload).encode()
+            response_headers.append((b"content-type", b"application/json"))
+        if scope["method"] == "GET" and status == 200:
+            etag = f'"{hashlib.sha1(raw).hexdigest()}"'
+            response_headers += [
+                (b"etag", etag.encode()),
+                (b"last-modified", self.modified.encode()),
+            ]
+            if headers.get("if-none-match") == etag:
+                status, raw = 304, b""
+        if len(raw) > 1024 and "gzip" in headers.get("accept-encoding", ""):
+            raw = gzip.compress(raw)
+            response_headers.append((b"content-encoding", b"gzip"))
+        response_headers.append((b"content-length", str(len(raw)).encode()))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": response_headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": raw})
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+_WORDS = (
+    "the students read a short passage about the river market in the old town "
+    "and answer questions about what the traders sell every morning"
+).split()
+
+
+def make_user(user_id: int) -> dict[str, Any]:
+    return {
+        "id": user_id,
+        "name": f"Student {user_id}",
+        "email": f"student{user_id}@example.com",
+        "avatarUrl": "",
+        "is_logged_in": True,
+    }
+
+
+def make_passage(words: int) -> str:
+    return " ".join(_WORDS[i % len(_WORDS)] for i in range(words))
+
+
+def make_questions(count: int = 4, answers: int = 4) -> list[dict[str, Any]]:
+    return [
+        {
+            "index": i,
+            "question": f"Question {i + 1} about the passage?",
+            "answers": [f"Answer {j + 1}" for j in range(answers)],
+            "correct_answer": i % answers,
+        }
+        for i in range(count)
+    ]
+
+
+def make_lesson(lesson_id: int, words: int = 300) -> dict[str, Any]:
+    """Build a lesson payload shaped like `lesson/v1/{id}` returns it."""
+    lesson_type = ("reading", "listening", "speaking")[lesson_id % 3]
+    if lesson_type == "reading":
+        content: dict[str, Any] = {
+            "text": make_passage(words),
+            "questions": make_questions(),
+        }
+    elif lesson_type == "listening":
+        content = {
+            "transcript": make_passage(words),
+            "audio_url": f"lesson-{lesson_id}",
+            "questions": make_questions(),
+        }
+    else:
+        content = {
+            "topic": f"Topic {lesson_id}",
+            "main_question": "Describe a place you like to visit.",
+            "guidelines": ["Where is it?", "When did you go?", "Why do you like it?"],
+        }
+    created_at = datetime(2025, 1, 1) + timedelta(hours=lesson_id)
+    return {
+        "id": lesson_id,
+        "name": f"Lesson {lesson_id}",
+        "description": f"A {lesson_type} lesson",
+        "type": lesson_type,
+        "level": lesson_id % 6 + 1,
+        "author": make_user(1),
+        "createdAt": created_at.isoformat(),
+        "content": content,
+    }
+
+
+def summarize(lesson: dict[str, Any]) -> dict[str, Any]:
+    """The `view=summary` projection of a lesson: no content, the author's
+    name instead of the author."""
+    return {
+        "id": lesson["id"],
+        "name": lesson["name"],
+        "description": lesson["description"],
+        "type": lesson["type"],
+        "level": lesson["level"],
+        "authorName": lesson["author"]["name"],
+        "createdAt": lesson["createdAt"],
+    }
+
+
+def make_generated(payload: dict[str, Any]) -> dict[str, Any]:
+    """Build the `content` that `lesson/v1/generate` returns for a request."""
+    lesson_type = payload.get("type", "reading")
+    questions = [
+        {
+            "index": q["index"],
+            "text": q["question"],
+            "answers": q["answers"],
+            "correct_answer": q["correct_answer"],
+        }
+        for q in make_questions()
+    ]
+    if lesson_type == "reading":
+        return {
+            "text": payload.get("text") or make_passage(300),
+            "questions": questions,
+        }
+    elif lesson_type == "listening":
+        return {
+            "transcript": payload.get("transcript") or make_passage(300),
+            "questions": questions,
+        }
+    return {
+        "topic": payload.get("text", "Topic"),
+        "main_question": "Describe a place you like to visit.",
+        "guidelines": ["Where is it?", "When did you go?", "Why do you like it?"],
+    }
+
+
+def make_grade(payload: dict[str, Any]) -> dict[str, Any]:
+    """Grade a submission the way `exercise/v1/grade` answers it."""
+    exercises = [
+        q | {"correct_answer": q["index"] % max(len(q["answers"]), 1)}
+        for q in payload.get("questions", [])
+    ]
+    score = sum(q["student_answer"] == q["correct_answer"] for q in exercises)
+    return {
+        "exercises": exercises,
+        "score": score,
+        "max_score": len(exercises),
+        "overall_comment": "Good effort.",
+        "detail_comment": f"{score} of {len(exercises)} answers are correct.",
+        "suggestions": "Read the passage again before answering.",
+    }
+
+
+def make_reply(words: int = 60) -> list[str]:
+    """Split a canned assistant reply into streamed tokens."""
+    return [f"{word} " for word in make_passage(words).split()]
+
+
+def make_wav(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    """Silent mono 16-bit WAV, standing in for synthesized speech."""
+    frames = int(seconds * rate)
+    data_size = frames * 2
+    header = (
+        b"RIFF"
+        + (36 + data_size).to_bytes(4, "little")
+        + b"WAVEfmt "
+        + (16).to_bytes(4, "little")
+        + (1).to_bytes(2, "little")
+        + (1).to_bytes(2, "little")
+        + rate.to_bytes(4, "little")
+        + (rate * 2).to_bytes(4, "little")
+        + (2).to_bytes(2, "little")
+        + (16).to_bytes(2, "little")
+        + b"data"
+        + data_size.to_bytes(4, "little")
+    )
+    return header + bytes(data_size)
@@ -0,0 +1,36 @@
+import av
+import numpy as np
+import pydub
+
+
+def frame_energy(frame: av.AudioFrame):
+    samples = np.frombuffer(frame.to_ndarray().tobytes(), dtype=np.int16)
+    return np.sqrt(np.mean(samples**2))
+
+
+def add_frame_to_chunk(sound_chunk: pydub.AudioSegment, audio_frame: av.AudioFrame):
+    sound = pydub.AudioSegment(
+        data=audio_frame.to_ndarray().tobytes(),
+        sample_width=audio_frame.format.bytes,
+        frame_rate=audio_frame.sample_rate,
+        channels=len(audio_frame.layout.channels),
+    )
+    sound_chunk += sound
+    return sound_chunk
+
+
+def process_audio_frame(
+    audio_frames: list[av.AudioFrame],
+    sound_chunk: pydub.AudioSegment,
+    silence_frames: int,
+    enery_threshold: int,
+):
+    for audio_frame in audio_frames:
+        sound_chunk = add_frame_to_chunk(sound_chunk, audio_frame)
+
+        energy = frame_energy(audio_frame)
+        if energy < enery_threshold:
+            silence_frames += 1
+        else:
+            silence_frames = 0
+    return sound_chunk, silence_frames
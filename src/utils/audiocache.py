@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import hashlib
+import io
+import json
+from pathlib import Path
+
+import logfire
+import pydub
+
+from .diskstore import DiskStore, InFlight, atomic_write
+
+# codec setting -> (pydub export format, ffmpeg encoder)
+CODECS = {"opus": ("ogg", "libopus"), "mp3": ("mp3", "libmp3lame")}
+MIMETYPES = {
+    "ogg": "audio/ogg",
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "bin": "application/octet-stream",
+}
+INDEX_FILE = "index.json"
+
+
+@dataclass(frozen=True, slots=True)
+class AudioAsset:
+    """An audio file in the cache, ready for `st.audio(path, format=mimetype)`."""
+
+    path: Path
+    mimetype: str
+    size: int
+
+
+def sniff_extension(data: bytes) -> str:
+    """File extension of encoded audio, from its magic bytes."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:4] == b"fLaC":
+        return "flac"
+    if data[:3] == b"ID3" or data[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "mp3"
+    return "bin"
+
+
+def transcode(data: bytes, codec: str, bitrate: str) -> bytes:
+    """Re-encode audio with `codec` (`opus` or `mp3`) at `bitrate`.
+
+    Raises:
+        Exception: pydub could not decode or encode it, e.g. without ffmpeg.
+    """
+    fmt, encoder = CODECS[codec]
+    segment = pydub.AudioSegment.from_file(io.BytesIO(data))
+    out = io.BytesIO()
+    segment.export(out, format=fmt, codec=encoder, bitrate=bitrate)
+    return out.getvalue()
+
+
+class AudioCache:
+    """
+    Disk-backed, content-addressed LRU cache of lesson audio.
+
+    Audio is fetched once per source, transcoded to a compact codec and
+    stored under the SHA-256 of the result, so the same recording behind
+    different URLs is kept once. An index on disk maps each source (with the
+    codec and bitrate it was encoded with) to its file, so the cache survives
+    restarts. Files are kept in a `DiskStore`, which deletes the least
+    recently used past `max_bytes`. Concurrent requests for the same source
+    share one fetch. Must be used from the network event loop.
+
+    Args:
+        directory (Path): Where the files and the index are kept.
+        max_bytes (int): Byte budget of the files.
+        codec (str): `opus`, `mp3`, or `original` to keep the backend's bytes.
+        bitrate (str): Target bitrate, e.g. `48k`.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, codec: str, bitrate: str):
+        self.directory = directory
+        self.codec = codec
+        self.bitrate = bitrate
+        self._store = DiskStore(directory, max_bytes, ignore=(INDEX_FILE,))
+        self._loading: InFlight[AudioAsset] = InFlight()
+        self._stats = {
+            "hit": 0,
+            "miss": 0,
+            "transcode_failures": 0,
+            "bytes_fetched": 0,
+            "bytes_stored": 0,
+        }
+        try:
+            index = json.loads((directory / INDEX_FILE).read_text())
+        except (OSError, ValueError):
+            index = {}
+        self._index: dict[str, str] = {
+            k: v for k, v in index.items() if v in self._store
+        }
+
+    def _key(self, source: str) -> str:
+        if self.codec == "original":
+            return source
+        return f"{source}|{self.codec}|{self.bitrate}"
+
+    async def get(
+        self, source: str, fetch: Callable[[], Awaitable[bytes]]
+    ) -> AudioAsset:
+        """Return the cached audio of `source`, calling `fetch` for its bytes
+        when it is not cached yet."""
+        key = self._key(source)
+        name = self._index.get(key)
+        if name is not None and name in self._store:
+            self._store.touch(name)
+            self._stats["hit"] += 1
+            return self._asset(name)
+        if key not in self._loading:
+            self._stats["miss"] += 1
+        return await self._loading.run(key, lambda: self._load(key, fetch))
+
+    async def _load(self, key: str, fetch: Callable[[], Awaitable[bytes]]):
+        data = await fetch()
+        self._stats["bytes_fetched"] += len(data)
+        data = await asyncio.to_thread(self._encode, data)
+        name = f"{hashlib.sha256(data).hexdigest()}.{sniff_extension(data)}"
+        evicted = []
+        if name in self._store:
+            self._store.touch(name)
+        else:
+            evicted = await self._store.write(name, data)
+            self._stats["bytes_stored"] += len(data)
+        self._index[key] = name
+        if evicted:
+            gone = set(evicted)
+            self._index = {k: v for k, v in self._index.items() if v not in gone}
+        asset = self._asset(name)
+        await asyncio.to_thread(self._save_index, dict(self._index))
+        return asset
+
+    def _encode(self, data: bytes) -> bytes:
+        if self.codec == "original":
+            return data
+        try:
+            return transcode(data, self.codec, self.bitrate)
+        except Exception as e:
+            # Serving the original beats not serving at all.
+            self._stats["transcode_failures"] += 1
+            logfire.warn(
+                "Transcoding audio to {codec} failed", codec=self.codec, _exc_info=e
+            )
+            return data
+
+    def _save_index(self, index: dict[str, str]):
+        atomic_write(self.directory / INDEX_FILE, json.dumps(index).encode())
+
+    def _asset(self, name: str) -> AudioAsset:
+        ext = name.rsplit(".", 1)[-1]
+        return AudioAsset(
+            self._store.path(name),
+            MIMETYPES.get(ext, MIMETYPES["bin"]),
+            self._store.size(name),
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {**self._store.stats(), **self._stats}
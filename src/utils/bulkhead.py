@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+import time
+
+import logfire
+
+_queued = logfire.metric_up_down_counter(
+    "backend.bulkhead.queued",
+    description="Calls waiting for a slot in their endpoint group",
+)
+_wait = logfire.metric_histogram(
+    "backend.bulkhead.wait",
+    unit="s",
+    description="Time calls waited for a slot in their endpoint group",
+)
+
+
+class BulkheadFullError(RuntimeError):
+    """No slot freed up in the endpoint group within its queue timeout."""
+
+
+class Bulkhead:
+    """
+    Concurrency limit for one group of backend endpoints.
+
+    Calls beyond `limit` queue for at most `queue_timeout` seconds, so a
+    flood of slow LLM calls cannot take every connection and thread from
+    cheap lookups. Must be used from the network event loop.
+
+    Args:
+        name (str): Endpoint group name, used as the metric attribute.
+        limit (int): Calls allowed in flight at once.
+        queue_timeout (float): Seconds a call may wait for a slot.
+    """
+
+    def __init__(self, name: str, limit: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.max_wait = 0.0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def saturated(self) -> bool:
+        """Whether a new call would have to queue. Safe to read from any thread."""
+        return self.active + self.waiting >= self.limit
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot for the duration of the block.
+
+        Raises:
+            BulkheadFullError: no slot freed up within the queue timeout.
+        """
+        attributes = {"group": self.name}
+        start = time.perf_counter()
+        self.waiting += 1
+        _queued.add(1, attributes)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except TimeoutError:
+            self.rejected += 1
+            raise BulkheadFullError(
+                f"No capacity in {self.name} after {self.queue_timeout}s"
+            ) from None
+        finally:
+            self.waiting -= 1
+            _queued.add(-1, attributes)
+            waited = time.perf_counter() - start
+            _wait.record(waited, attributes)
+            self.max_wait = max(self.max_wait, waited)
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.waiting,
+            "rejected": self.rejected,
+            "max_wait": self.max_wait,
+        }
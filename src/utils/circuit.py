@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections import deque
+from enum import Enum
+import threading
+import time
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for one group of backend endpoints.
+
+    While closed, outcomes are recorded over a sliding time window; once at
+    least `min_calls` calls in the window failed at `failure_rate` or more,
+    the circuit opens and calls are rejected without touching the network.
+    After `open_for` seconds it lets `half_open_calls` probes through: a
+    successful probe closes it again, a failed one re-opens it.
+
+    Args:
+        window (float): Length of the sliding window in seconds.
+        min_calls (int): Calls needed in the window before the rate counts.
+        failure_rate (float): Failure ratio (0-1) that opens the circuit.
+        open_for (float): Seconds to stay open before probing.
+        half_open_calls (int): Concurrent probes allowed while half-open.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        min_calls: int,
+        failure_rate: float,
+        open_for: float,
+        half_open_calls: int,
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_for = open_for
+        self.half_open_calls = half_open_calls
+        self.state = CircuitState.CLOSED
+        self.rejected = 0
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now. Rejections are counted."""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self._opened_at < self.open_for:
+                    self.rejected += 1
+                    return False
+                self.state = CircuitState.HALF_OPEN
+                self._probes = 0
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, ok: bool):
+        """Record the outcome of a call that `allow` let through."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._probes -= 1
+                if ok:
+                    self.state = CircuitState.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open(now)
+                return
+            if self.state == CircuitState.OPEN:
+                return
+
+            self._outcomes.append((now, ok))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+            calls = len(self._outcomes)
+            failures = sum(1 for _, success in self._outcomes if not success)
+            if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                self._open(now)
+
+    def release(self):
+        """Give back a call slot without a verdict, e.g. a cancelled call."""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _open(self, now: float):
+        self.state = CircuitState.OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+
+    def stats(self) -> dict[str, int | str]:
+        with self._lock:
+            return {
+                "state": self.state.value,
+                "calls": len(self._outcomes),
+                "failures": sum(1 for _, ok in self._outcomes if not ok),
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections import defaultdict
+import gzip
+import time
+
+import httpx
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is always available
+    zstandard = None
+
+
+_server_encodings: frozenset[str] | None = None
+_stats: defaultdict[str, dict[str, float]] = defaultdict(
+    lambda: {
+        "compressed": 0,
+        "uncompressed": 0,
+        "request_raw_bytes": 0,
+        "request_sent_bytes": 0,
+        "compress_seconds": 0.0,
+        "response_wire_bytes": 0,
+        "response_bytes": 0,
+    }
+)
+
+
+def available_encodings() -> frozenset[str]:
+    if zstandard is None:
+        return frozenset({"gzip"})
+    return frozenset({"gzip", "zstd"})
+
+
+def note_response(group: str, resp: httpx.Response):
+    """Learn request encodings the backend accepts and measure the response.
+
+    A server advertises the codings it accepts for request bodies with an
+    `Accept-Encoding` response header (RFC 7694).
+    """
+    global _server_encodings
+    accepted = resp.headers.get("Accept-Encoding")
+    if accepted is not None:
+        _server_encodings = frozenset(
+            e.split(";")[0].strip().lower() for e in accepted.split(",") if e.strip()
+        )
+    stats = _stats[group]
+    stats["response_wire_bytes"] += resp.num_bytes_downloaded
+    stats["response_bytes"] += len(resp.content)
+
+
+def mark_unsupported():
+    """The backend rejected a compressed body; stop compressing until told otherwise."""
+    global _server_encodings
+    _server_encodings = frozenset()
+
+
+def choose_encoding(
+    mode: str, algorithm: str, min_size: int, enabled: bool, size: int
+) -> str | None:
+    """Pick the content coding for a request body, or None to send it as is.
+
+    Args:
+        mode (str): `negotiate` compresses only with a coding the backend has
+            advertised, `always` compresses regardless, `off` never does.
+        algorithm (str): Preferred coding, `zstd` or `gzip`.
+        min_size (int): Bodies smaller than this are sent as is.
+        enabled (bool): Whether the endpoint group compresses at all.
+        size (int): Body size in bytes.
+    """
+    if mode == "off" or not enabled or size < min_size:
+        return None
+    candidates = [algorithm, "gzip"]
+    usable = available_encodings()
+    if mode == "negotiate":
+        if not _server_encodings:
+            return None
+        usable = usable & _server_encodings
+    for encoding in candidates:
+        if encoding in usable:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        assert zstandard is not None
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def compress_measured(group: str, data: bytes, encoding: str) -> bytes:
+    start = time.perf_counter()
+    compressed = compress(data, encoding)
+    stats = _stats[group]
+    stats["compressed"] += 1
+    stats["request_raw_bytes"] += len(data)
+    stats["request_sent_bytes"] += len(compressed)
+    stats["compress_seconds"] += time.perf_counter() - start
+    return compressed
+
+
+def record_uncompressed(group: str, size: int):
+    stats = _stats[group]
+    stats["uncompressed"] += 1
+    stats["request_raw_bytes"] += size
+    stats["request_sent_bytes"] += size
+
+
+def get_compression_stats() -> dict[str, dict[str, float]]:
+    """Per endpoint group: bodies compressed or not, request bytes before and
+    after compression, time spent compressing, and response bytes on the wire
+    versus decoded.
+    """
+    return {group: dict(stats) for group, stats in list(_stats.items())}
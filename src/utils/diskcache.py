@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+import logfire
+
+from .diskstore import DiskStore, InFlight
+
+_lookups = logfire.metric_counter(
+    "backend.disk_cache.lookups",
+    description="Reads of a disk cache, by cache and outcome (hit, miss, bypass)",
+)
+
+
+class DiskCache:
+    """
+    JSON values on disk by key, with a byte budget.
+
+    Each value is one file named by the SHA-256 of its key, so server
+    processes sharing `directory` share the values. Files are kept in a
+    `DiskStore`, which deletes the least recently used past `max_bytes`.
+    `get(..., refresh=True)` skips the stored value and replaces it.
+    Concurrent computations of the same key in a process are shared. Must be
+    used from the network event loop.
+
+    Args:
+        name (str): Cache name, used as the metric attribute.
+        directory (Path): Where the values are kept.
+        max_bytes (int): Byte budget of the files.
+    """
+
+    def __init__(self, name: str, directory: Path, max_bytes: int):
+        self.name = name
+        self._store = DiskStore(directory, max_bytes)
+        self._computing: InFlight[Any] = InFlight()
+        self._stats = {"hit": 0, "miss": 0, "bypass": 0}
+
+    async def get(
+        self, key: str, compute: Callable[[], Awaitable[Any]], refresh: bool = False
+    ) -> Any:
+        """Return the value stored for `key`, or compute and store it."""
+        name = f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+        if not refresh:
+            data = await self._store.read(name)
+            if data is not None:
+                try:
+                    value = json.loads(data)
+                except ValueError:
+                    pass
+                else:
+                    self._record("hit")
+                    return value
+        if name not in self._computing:
+            self._record("bypass" if refresh else "miss")
+        return await self._computing.run(name, lambda: self._compute(name, compute))
+
+    async def _compute(self, name: str, compute: Callable[[], Awaitable[Any]]):
+        value = await compute()
+        await self._store.write(name, json.dumps(value, ensure_ascii=False).encode())
+        return value
+
+    def _record(self, outcome: str):
+        self._stats[outcome] += 1
+        _lookups.add(1, {"cache": self.name, "outcome": outcome})
+
+    def stats(self) -> dict[str, int]:
+        return {**self._store.stats(), **self._stats}
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Collection, Hashable
+import contextlib
+import os
+from pathlib import Path
+import tempfile
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write `path` so that readers, in any process, see the old or the new
+    content, never a part of it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class DiskStore:
+    """
+    Files in a directory, with a byte budget.
+
+    Files are named by the caller, and may be in subdirectories
+    (`ab/abcd.json`). Once they pass `max_bytes`, the least recently used are
+    deleted; the newest stays even if it alone is over the budget. Recency
+    survives restarts, and other processes sharing `directory` see it,
+    through the file times. Must be used from the network event loop.
+
+    Args:
+        directory (Path): Where the files are kept.
+        max_bytes (int, optional): Byte budget of the files; None for no
+            budget.
+        ignore (Collection[str]): Files of the directory the store leaves
+            alone, e.g. an index.
+    """
+
+    def __init__(
+        self, directory: Path, max_bytes: int | None, ignore: Collection[str] = ()
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # file name -> size, least recently used first
+        self._files: OrderedDict[str, int] = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._open(set(ignore))
+
+    def _open(self, ignore: set[str]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for path in self.directory.rglob("*"):
+            if not path.is_file():
+                continue
+            if path.suffix == ".part":
+                path.unlink(missing_ok=True)  # left by an interrupted write
+            elif path.relative_to(self.directory).as_posix() not in ignore:
+                paths.append(path)
+        for path in sorted(paths, key=lambda p: p.stat().st_mtime):
+            name = path.relative_to(self.directory).as_posix()
+            self._set(name, path.stat().st_size)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._files
+
+    def path(self, name: str) -> Path:
+        return self.directory / name
+
+    def size(self, name: str) -> int:
+        return self._files[name]
+
+    def touch(self, name: str):
+        """Mark a file known to the store as just used."""
+        self._files.move_to_end(name)
+        with contextlib.suppress(OSError):
+            os.utime(self.path(name))
+
+    async def read(self, name: str) -> bytes | None:
+        """The content of a file, None if there is none. Files written by
+        other processes are read too, and taken into the budget."""
+        data = await asyncio.to_thread(self._read, name)
+        if data is not None:
+            self._set(name, len(data))
+        return data
+
+    def _read(self, name: str) -> bytes | None:
+        path = self.path(name)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return data
+
+    async def write(self, name: str, data: bytes) -> list[str]:
+        """Write a file, replacing any other with its name, and return the
+        names of the files deleted to stay within the budget."""
+        await asyncio.to_thread(atomic_write, self.path(name), data)
+        self._set(name, len(data))
+        return self._evict()
+
+    def _set(self, name: str, size: int):
+        # The total is kept rather than summed, stores can hold many small
+        # files.
+        self._bytes += size - self._files.get(name, 0)
+        self._files[name] = size
+        self._files.move_to_end(name)
+
+    def _evict(self) -> list[str]:
+        evicted = []
+        if self.max_bytes is None:
+            return evicted
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            name, size = self._files.popitem(last=False)
+            self._bytes -= size
+            self.path(name).unlink(missing_ok=True)
+            evicted.append(name)
+        self._evictions += len(evicted)
+        return evicted
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "files": len(self._files),
+            "bytes": self._bytes,
+            "evictions": self._evictions,
+        }
+
+
+class InFlight(Generic[T]):
+    """
+    Computations under way, by key, so that concurrent requests for the same
+    key share one. A caller that is cancelled does not cancel the
+    computation, which the others may still wait for. Must be used from the
+    network event loop.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Future[T]] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        """The result of the computation of `key` under way, or of
+        `compute()` started now."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
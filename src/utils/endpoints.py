@@ -0,0 +1,126 @@
+"""Registry of the backend's routes.
+
+Each route is declared once with its URL template and how it is called: its
+endpoint group (circuit breaker and bulkhead), timeout class, whether it is
+idempotent (retried, hedged) and whether its responses may be cached and
+revalidated. Templates are compiled against the configured backend URL on
+first use, so building a URL is a string join.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import string
+from typing import Literal
+from urllib.parse import quote, urlencode
+
+from settings import get_settings
+
+Method = Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """A backend route, independent of where the backend runs."""
+
+    method: Method
+    template: str
+    group: str
+    timeout_class: str
+    idempotent: bool = False
+    cacheable: bool = False
+
+
+ROUTES: dict[str, Route] = {
+    "user.create": Route("POST", "user/v1/create", "write", "write"),
+    "user.update": Route("POST", "user/v1/update", "write", "write"),
+    "user.get": Route(
+        "GET", "user/v1/{email}", "lookup", "lookup", idempotent=True, cacheable=True
+    ),
+    "lesson.list": Route(
+        "GET", "lesson/v1/list", "lookup", "lookup", idempotent=True, cacheable=True
+    ),
+    "lesson.page": Route(
+        "GET", "lesson/v1/page", "lookup", "lookup", idempotent=True, cacheable=True
+    ),
+    "lesson.get": Route(
+        "GET",
+        "lesson/v1/{lesson_id}",
+        "lookup",
+        "lookup",
+        idempotent=True,
+        cacheable=True,
+    ),
+    "lesson.upload": Route("POST", "lesson/v1/upload", "write", "write"),
+    "lesson.generate": Route("POST", "lesson/v1/generate", "generate", "llm"),
+    "exercise.grade": Route("POST", "exercise/v1/grade", "grade", "llm"),
+    "audio.convert": Route("POST", "resources/v1/audio/convert", "audio", "audio"),
+    "audio.text": Route("POST", "resources/v1/audio/text", "audio", "audio"),
+    # Audio bytes are cached on disk by `AudioCache`, not as responses.
+    "audio.get": Route(
+        "GET", "resources/v1/audio/{uid}", "audio", "audio", idempotent=True
+    ),
+    "chat.stream": Route("POST", "chat/v1/stream", "chat", "llm"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Endpoint:
+    """A route compiled against the backend URL."""
+
+    name: str
+    route: Route
+    # Literal text and parameter names, alternating, starting with text.
+    _parts: tuple[str, ...] = field(repr=False)
+
+    @property
+    def method(self) -> Method:
+        return self.route.method
+
+    @property
+    def params(self) -> tuple[str, ...]:
+        return self._parts[1::2]
+
+    def url(self, **params: object) -> str:
+        """The URL with `params` substituted, each percent-encoded. Parameters
+        not in the template form the query string, sorted, leaving out None.
+
+        Raises:
+            KeyError: a parameter of the template is missing.
+        """
+        parts = list(self._parts)
+        for i in range(1, len(parts), 2):
+            parts[i] = quote(str(params.pop(parts[i])), safe="@")
+        query = sorted((k, v) for k, v in params.items() if v is not None)
+        if query:
+            parts.append("?" + urlencode(query))
+        return "".join(parts)
+
+
+def base_url() -> str:
+    """The configured backend URL, path included, ending with a slash."""
+    url = get_settings().connection.backend_url.unicode_string()
+    return url if url.endswith("/") else url + "/"
+
+
+def compile_route(name: str, route: Route, base: str) -> Endpoint:
+    parts = [base]
+    for text, param, spec, conversion in string.Formatter().parse(route.template):
+        if spec or conversion:
+            raise ValueError(f"{name}: only plain {{name}} parameters are supported")
+        parts[-1] += text
+        if param is not None:
+            parts += [param, ""]
+    return Endpoint(name, route, tuple(parts))
+
+
+_endpoints: dict[str, Endpoint] | None = None
+
+
+def get_endpoint(name: str) -> Endpoint:
+    """Return the compiled endpoint of a route in `ROUTES`."""
+    global _endpoints
+    if _endpoints is None:
+        base = base_url()
+        _endpoints = {n: compile_route(n, r, base) for n, r in ROUTES.items()}
+    return _endpoints[name]
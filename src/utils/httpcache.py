@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Any
+
+import httpx
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    result: Any
+    etag: str | None = None
+    last_modified: str | None = None
+    # When the backend last answered with this result (200, or 304), by
+    # `time.monotonic`; serving it stale does not change it.
+    validated_at: float = field(default_factory=time.monotonic)
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    LRU of parsed GET results with their HTTP validators.
+
+    Entries hold the already-parsed result, so a `304 Not Modified` answer is
+    served without decoding or validating the body again. The last result is
+    also kept for URLs without validators, to serve stale while the backend
+    is unavailable.
+
+    Args:
+        max_entries (int): Entries kept before the least recently used is evicted.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"revalidated": 0, "refreshed": 0, "stale_served": 0}
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: Hashable, result: Any, resp: httpx.Response):
+        entry = CacheEntry(
+            result=result,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._stats["refreshed"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), **self._stats}
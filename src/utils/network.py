@@ -1,32 +1,810 @@
-from contextlib import contextmanager
-from pydantic import HttpUrl
+import asyncio
+import atexit
+import concurrent.futures
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+import json
+import random
+import threading
+import time
+from typing import Any, TypeVar
+
 import logfire
 import httpx
 
 from settings import get_settings
 
+from . import compression, rerun
+from .audiocache import AudioCache
+from .bulkhead import Bulkhead, BulkheadFullError
+from .circuit import CircuitBreaker
+from .diskcache import DiskCache
+from .endpoints import base_url, get_endpoint
+from .httpcache import CacheEntry, ResponseCache
+from .ttlcache import TTLCache
+from .ttsmemo import TTSMemo
+
+T = TypeVar("T")
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_async_client: httpx.AsyncClient | None = None
+_transport: httpx.AsyncBaseTransport | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+_requests_sent = 0
+_inflight: dict[Hashable, asyncio.Future] = {}
+_single_flight_stats = {"upstream": 0, "coalesced": 0}
+_latencies: dict[str, deque[float]] = {}
+_retry_stats = {"retries": 0, "hedged": 0, "hedge_wins": 0}
+
+# Gateway errors worth retrying for an idempotent request.
+_RETRY_STATUSES = frozenset({502, 503, 504})
+# Bodies larger than this are compressed off the network loop.
+_COMPRESS_OFFLOAD_BYTES = 256 * 1024
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_response_cache: ResponseCache | None = None
+_bulkheads: dict[str, Bulkhead] = {}
+_ttl_caches: dict[str, TTLCache] = {}
+_audio_cache: AudioCache | None = None
+_tts_memo: TTSMemo | None = None
+_generation_cache: DiskCache | None = None
+
+
+class BackendUnavailableError(RuntimeError):
+    """The backend could not be reached or did not answer within its deadline."""
+
+
+class CircuitOpenError(BackendUnavailableError):
+    """The endpoint group's circuit is open; the call was not sent."""
+
+
+def _http2_enabled() -> bool:
+    if not get_settings().connection.pool.http2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logfire.warn("HTTP/2 requested but `h2` is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def _count_request(request: httpx.Request):
+    global _requests_sent
+    _requests_sent += 1
+
+
+async def _acount_request(request: httpx.Request):
+    _count_request(request)
+
+
+def _pool_limits() -> httpx.Limits:
+    pool = get_settings().connection.pool
+    return httpx.Limits(
+        max_connections=pool.max_connections,
+        max_keepalive_connections=pool.max_keepalive_connections,
+        keepalive_expiry=pool.keepalive_expiry,
+    )
+
+
+def get_timeout(timeout_class: str) -> httpx.Timeout:
+    """Build the `httpx.Timeout` for a profile in `Settings.connection.timeouts`.
+
+    Args:
+        timeout_class (str): `lookup`, `write`, `llm` or `audio`.
+    """
+    profile = getattr(get_settings().connection.timeouts, timeout_class)
+    return httpx.Timeout(
+        connect=profile.connect,
+        read=profile.read,
+        write=profile.write,
+        pool=profile.pool,
+    )
+
+
+def _create_client() -> httpx.Client:
+    client = httpx.Client(
+        timeout=get_timeout("lookup"),
+        limits=_pool_limits(),
+        http2=_http2_enabled(),
+        event_hooks={"request": [_count_request]},
+    )
+    logfire.instrument_httpx(client)
+    return client
+
+
+def get_shared_client() -> httpx.Client:
+    """Return the process-wide pooled client, creating it on first use.
+
+    The client is shared by every Streamlit session and script thread so
+    connections are kept alive and reused instead of re-handshaking per call.
+    """
+    global _client
+    client = _client
+    if client is not None and not client.is_closed:
+        return client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = _create_client()
+        return _client
+
 
 @contextmanager
 def get_httpx_client():
-    with httpx.Client(timeout=None) as client:
-        logfire.instrument_httpx(client)
-        yield client
+    # The shared client outlives the `with` block; it is closed at shutdown.
+    yield get_shared_client()
 
 
-def build_url(path: str):
-    base_url = get_settings().connection.backend_url
-    assert base_url.host
-    new_url = HttpUrl.build(
-        scheme=base_url.scheme,
-        host=base_url.host,
-        port=base_url.port,
-        path=path,
+def _run_loop(loop: asyncio.AbstractEventLoop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the dedicated network event loop, starting its thread on first use.
+
+    All async backend calls run on this single loop so they share one
+    `httpx.AsyncClient` whatever session thread scheduled them.
+    """
+    global _loop
+    loop = _loop
+    if loop is not None and loop.is_running():
+        return loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_run_loop, args=(_loop,), name="network-loop", daemon=True
+            ).start()
+        return _loop
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared async client. Must be called on the network loop."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=get_timeout("lookup"),
+            limits=_pool_limits(),
+            http2=_http2_enabled(),
+            transport=_transport,
+            event_hooks={"request": [_acount_request]},
+        )
+        logfire.instrument_httpx(_async_client)
+    return _async_client
+
+
+def use_transport(transport: httpx.AsyncBaseTransport | None):
+    """Send async backend calls through `transport`, e.g. an in-process
+    `httpx.ASGITransport` wrapping the stand-in backend. `None` restores the
+    network transport.
+    """
+
+    async def _swap():
+        global _transport, _async_client
+        if _async_client is not None:
+            await _async_client.aclose()
+            _async_client = None
+        _transport = transport
+
+    run_sync(_swap())
+
+
+async def _await(awaitable: Awaitable[T], scope: rerun.RerunScope | None) -> T:
+    rerun.active_scope.set(scope)
+    return await awaitable
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Run `awaitable` on the network loop and block until it finishes.
+
+    Requests it sends are counted against the calling script run, see
+    `utils.rerun`.
+    """
+    scope = rerun.current_scope()
+    result = asyncio.run_coroutine_threadsafe(
+        _await(awaitable, scope), get_event_loop()
+    ).result()
+    if scope is not None:
+        scope.check()
+    return result
+
+
+def run_background(awaitable: Awaitable[Any]) -> concurrent.futures.Future:
+    """Start `awaitable` on the network loop without waiting for it, e.g. to
+    warm a cache a later rerun reads. Failures are logged, not raised."""
+
+    def done(future: concurrent.futures.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logfire.error("Background call failed", _exc_info=future.exception())
+
+    future = asyncio.run_coroutine_threadsafe(_await(awaitable, None), get_event_loop())
+    future.add_done_callback(done)
+    return future
+
+
+def gather_sync(*awaitables: Awaitable[Any]) -> list[Any]:
+    """Run independent awaitables concurrently and return their results in order.
+
+    A failed call yields its exception in place of a result so one failing
+    request does not discard the others.
+    """
+
+    async def _gather():
+        return await asyncio.gather(*awaitables, return_exceptions=True)
+
+    return run_sync(_gather())
+
+
+def iterate_sync(agen: AsyncIterator[T]) -> Iterator[T]:
+    """Consume an async iterator from a synchronous script thread."""
+    try:
+        while True:
+            try:
+                yield run_sync(anext(agen))
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(agen, "aclose", None)
+        if aclose is not None:
+            run_sync(aclose())
+
+
+def _record_latency(timeout_class: str, elapsed: float):
+    samples = _latencies.get(timeout_class)
+    if samples is None:
+        samples = _latencies[timeout_class] = deque(maxlen=500)
+    samples.append(elapsed)
+
+
+def _hedge_delay(timeout_class: str) -> float | None:
+    hedge = get_settings().connection.hedge
+    samples = _latencies.get(timeout_class)
+    if not hedge.enabled or samples is None or len(samples) < hedge.min_samples:
+        return None
+    ordered = sorted(samples)
+    index = min(int(len(ordered) * hedge.percentile), len(ordered) - 1)
+    return max(ordered[index], hedge.min_delay)
+
+
+async def _send_once(
+    method: str, url: str, timeout_class: str, **kwargs
+) -> httpx.Response:
+    start = time.perf_counter()
+    resp = await get_async_client().request(
+        method, url, timeout=get_timeout(timeout_class), **kwargs
     )
-    return new_url.unicode_string()
+    _record_latency(timeout_class, time.perf_counter() - start)
+    return resp
+
+
+async def _send_hedged(
+    method: str, url: str, timeout_class: str, **kwargs
+) -> httpx.Response:
+    """Send, and race a duplicate if the first try outlives the class's p95."""
+    delay = _hedge_delay(timeout_class)
+    first = asyncio.ensure_future(_send_once(method, url, timeout_class, **kwargs))
+    if delay is None:
+        return await first
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+
+    _retry_stats["hedged"] += 1
+    second = asyncio.ensure_future(_send_once(method, url, timeout_class, **kwargs))
+    pending = {first, second}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        _retry_stats["hedge_wins"] += 1
+                    return task.result()
+        return first.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _backoff(attempt: int) -> float:
+    retry = get_settings().connection.retry
+    # Full jitter keeps a class full of retrying sessions from re-synchronising.
+    return random.uniform(0, min(retry.max_backoff, retry.backoff * 2**attempt))
+
+
+async def _request(
+    method: str,
+    url: str,
+    *,
+    timeout_class: str,
+    idempotent: bool,
+    **kwargs,
+) -> httpx.Response:
+    if not idempotent:
+        try:
+            return await _send_once(method, url, timeout_class, **kwargs)
+        except httpx.TransportError as e:
+            raise BackendUnavailableError(f"{method} {url} failed: {e!r}") from e
+
+    attempts = max(get_settings().connection.retry.attempts, 1)
+    for attempt in range(attempts):
+        if attempt:
+            _retry_stats["retries"] += 1
+            await asyncio.sleep(_backoff(attempt))
+        try:
+            resp = await _send_hedged(method, url, timeout_class, **kwargs)
+        except httpx.TransportError as e:
+            if attempt + 1 == attempts:
+                raise BackendUnavailableError(f"{method} {url} failed: {e!r}") from e
+            continue
+        if resp.status_code not in _RETRY_STATUSES or attempt + 1 == attempts:
+            return resp
+    raise AssertionError("unreachable")
+
+
+def get_breaker(group: str) -> CircuitBreaker:
+    """Return the circuit breaker of an endpoint group, e.g. `lookup` or `grade`."""
+    breaker = _breakers.get(group)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(group)
+            if breaker is None:
+                cfg = get_settings().connection.breaker
+                breaker = _breakers[group] = CircuitBreaker(
+                    window=cfg.window,
+                    min_calls=cfg.min_calls,
+                    failure_rate=cfg.failure_rate,
+                    open_for=cfg.open_for,
+                    half_open_calls=cfg.half_open_calls,
+                )
+    return breaker
+
+
+def get_bulkhead(group: str) -> Bulkhead:
+    """Return the concurrency pool of an endpoint group, see `Bulkhead`."""
+    bulkhead = _bulkheads.get(group)
+    if bulkhead is None:
+        cfg = getattr(get_settings().connection.bulkheads, group)
+        bulkhead = _bulkheads.setdefault(
+            group, Bulkhead(group, cfg.limit, cfg.queue_timeout)
+        )
+    return bulkhead
+
+
+def _serialize_body(kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Encode a `json=` body up front so it can be measured and compressed."""
+    if "json" not in kwargs:
+        return kwargs
+    kwargs = dict(kwargs)
+    payload = kwargs.pop("json")
+    headers = dict(kwargs.pop("headers", None) or {})
+    headers["Content-Type"] = "application/json"
+    kwargs["headers"] = headers
+    kwargs["content"] = json.dumps(
+        payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False
+    ).encode()
+    return kwargs
+
+
+async def _compress_body(group: str, kwargs: dict[str, Any]) -> dict[str, Any] | None:
+    """Return `kwargs` with a compressed body, or None to send it as is."""
+    body = kwargs.get("content")
+    if not isinstance(body, bytes):
+        return None
+    cfg = get_settings().connection.compression
+    encoding = compression.choose_encoding(
+        cfg.mode,
+        cfg.algorithm,
+        cfg.min_size,
+        group not in cfg.disabled_groups,
+        len(body),
+    )
+    if encoding is None:
+        compression.record_uncompressed(group, len(body))
+        return None
+    if len(body) > _COMPRESS_OFFLOAD_BYTES:
+        data = await asyncio.to_thread(
+            compression.compress_measured, group, body, encoding
+        )
+    else:
+        data = compression.compress_measured(group, body, encoding)
+    headers = dict(kwargs.get("headers") or {})
+    headers["Content-Encoding"] = encoding
+    return {**kwargs, "content": data, "headers": headers}
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    group: str = "lookup",
+    timeout_class: str = "lookup",
+    idempotent: bool | None = None,
+    **kwargs,
+) -> httpx.Response:
+    """Send a backend request within the deadline of its timeout class.
+
+    Idempotent requests (GETs by default) are retried with jittered backoff
+    on transport errors and gateway statuses, and may be hedged. Other
+    requests are sent exactly once. The call waits for a slot in the
+    bulkhead of `group`, and transport failures and 5xx responses count
+    against its circuit breaker. Request bodies above the configured size
+    are compressed when the backend accepts it; a `415` answer turns request
+    compression off and the body is resent as is.
+
+    Raises:
+        CircuitOpenError: the group's circuit is open; nothing was sent.
+        BulkheadFullError: no slot freed up in the group; nothing was sent.
+        BackendUnavailableError: the backend could not be reached in time.
+    """
+    if idempotent is None:
+        idempotent = method.upper() == "GET"
+    breaker = get_breaker(group)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{group} circuit is open, {method} {url} not sent")
+    rerun.note_request(method, url)
+    kwargs = _serialize_body(kwargs)
+    compressed = await _compress_body(group, kwargs)
+    try:
+        async with get_bulkhead(group).slot():
+            resp = await _request(
+                method,
+                url,
+                timeout_class=timeout_class,
+                idempotent=idempotent,
+                **(compressed or kwargs),
+            )
+            if resp.status_code == 415 and compressed is not None:
+                compression.mark_unsupported()
+                resp = await _request(
+                    method,
+                    url,
+                    timeout_class=timeout_class,
+                    idempotent=idempotent,
+                    **kwargs,
+                )
+    except BulkheadFullError:
+        breaker.release()
+        raise
+    except BackendUnavailableError:
+        breaker.record(False)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    breaker.record(resp.status_code < 500)
+    compression.note_response(group, resp)
+    return resp
+
+
+@asynccontextmanager
+async def stream(
+    method: str,
+    url: str,
+    *,
+    group: str = "chat",
+    timeout_class: str = "llm",
+    **kwargs,
+):
+    """Stream a backend response within the deadline of its timeout class.
+
+    Raises:
+        CircuitOpenError: the group's circuit is open; nothing was sent.
+        BulkheadFullError: no slot freed up in the group; nothing was sent.
+        BackendUnavailableError: the backend could not be reached in time.
+    """
+    breaker = get_breaker(group)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{group} circuit is open, {method} {url} not sent")
+    rerun.note_request(method, url)
+    recorded = False
+    try:
+        async with (
+            get_bulkhead(group).slot(),
+            get_async_client().stream(
+                method, url, timeout=get_timeout(timeout_class), **kwargs
+            ) as resp,
+        ):
+            breaker.record(resp.status_code < 500)
+            recorded = True
+            yield resp
+    except httpx.TransportError as e:
+        if not recorded:
+            breaker.record(False)
+            recorded = True
+        raise BackendUnavailableError(f"{method} {url} failed: {e!r}") from e
+    finally:
+        if not recorded:
+            breaker.release()
+
+
+def get_retry_stats() -> dict[str, int]:
+    """Retries sent, hedged duplicates sent and hedges that answered first."""
+    return dict(_retry_stats)
+
+
+async def single_flight(key: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    Runs on the network loop, so callers from every session thread meet here.
+    The shared call is shielded: a caller giving up does not cancel it for the
+    others.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        _single_flight_stats["upstream"] += 1
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        _single_flight_stats["coalesced"] += 1
+    return await asyncio.shield(task)
+
+
+async def get_coalesced(
+    url: str,
+    parse: Callable[[httpx.Response], T],
+    group: str = "lookup",
+    timeout_class: str = "lookup",
+) -> T:
+    """Idempotent, cached GET whose parsed result is shared by concurrent callers.
+
+    The parsed result is cached with the response's ETag/Last-Modified and
+    revalidated with a conditional request; on `304 Not Modified` the cached
+    objects are returned as is. The last good result is also served instead
+    of failing while the backend is unavailable (unreachable, or answering
+    5xx after the retries) or the group's circuit is open.
+
+    Args:
+        url (str): The URL to fetch.
+        parse (Callable): Turns the response into the result, in a worker
+            thread; part of the key, so pass a module-level function rather
+            than a lambda.
+        group (str): Endpoint group, see `get_breaker`.
+        timeout_class (str): Timeout profile, see `get_timeout`.
+    """
+
+    cache = get_response_cache()
+    key = ("GET", url, parse)
+
+    async def fetch():
+        entry = cache.get(key)
+        resp = await request(
+            "GET",
+            url,
+            group=group,
+            timeout_class=timeout_class,
+            headers=entry.validators() if entry else None,
+        )
+        if resp.status_code == 304 and entry is not None:
+            entry.validated_at = time.monotonic()
+            cache.count("revalidated")
+            return entry.result
+        if resp.status_code >= 500:
+            # Still failing after the retries: the backend is unavailable,
+            # whether or not the circuit has opened yet.
+            raise BackendUnavailableError(f"GET {url} returned {resp.status_code}")
+        # Parsing (validating a whole catalog, say) would hold up every
+        # other session's requests on the loop.
+        result = await asyncio.to_thread(parse, resp)
+        if resp.status_code == 200:
+            cache.store(key, result, resp)
+        return result
+
+    try:
+        return await single_flight(key, fetch)
+    except (BackendUnavailableError, BulkheadFullError):
+        entry = cache.get(key)
+        if entry is None:
+            raise
+        cache.count("stale_served")
+        return entry.result
+
+
+async def send(
+    endpoint: str, params: dict[str, Any] | None = None, **kwargs
+) -> httpx.Response:
+    """`request` a route of `utils.endpoints` with its method, group, timeout
+    class and idempotency; `params` fill in its URL template."""
+    ep = get_endpoint(endpoint)
+    return await request(
+        ep.method,
+        ep.url(**(params or {})),
+        group=ep.route.group,
+        timeout_class=ep.route.timeout_class,
+        idempotent=ep.route.idempotent,
+        **kwargs,
+    )
+
+
+def send_stream(endpoint: str, params: dict[str, Any] | None = None, **kwargs):
+    """`stream` a route of `utils.endpoints`, see `send`."""
+    ep = get_endpoint(endpoint)
+    return stream(
+        ep.method,
+        ep.url(**(params or {})),
+        group=ep.route.group,
+        timeout_class=ep.route.timeout_class,
+        **kwargs,
+    )
+
+
+async def fetch_cached(
+    endpoint: str, parse: Callable[[httpx.Response], T], **params: Any
+) -> T:
+    """`get_coalesced` a cacheable GET route of `utils.endpoints`."""
+    ep = get_endpoint(endpoint)
+    if not (ep.route.cacheable and ep.method == "GET"):
+        raise ValueError(f"{endpoint} is not a cacheable GET route")
+    return await get_coalesced(
+        ep.url(**params), parse, ep.route.group, ep.route.timeout_class
+    )
+
+
+def get_cached_entry(
+    endpoint: str, parse: Callable[[httpx.Response], Any], **params: Any
+) -> CacheEntry | None:
+    """What `fetch_cached` keeps of a route, without a request."""
+    url = get_endpoint(endpoint).url(**params)
+    return get_response_cache().get(("GET", url, parse))
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=get_settings().connection.cache.max_entries
+        )
+    return _response_cache
+
+
+def get_ttl_cache(name: str) -> TTLCache:
+    """Return a process-wide TTL cache configured in `Settings.connection.cache`,
+    e.g. `catalog`, see `TTLCache`."""
+    cache = _ttl_caches.get(name)
+    if cache is None:
+        cfg = getattr(get_settings().connection.cache, name)
+        cache = _ttl_caches.setdefault(
+            name, TTLCache(name, cfg.ttl, cfg.stale_for, cfg.beta)
+        )
+    return cache
+
+
+def get_ttl_cache_stats() -> dict[str, Any]:
+    """Hits, stale reads, misses, refreshes and oldest entry age per TTL cache."""
+    return {name: c.stats() for name, c in list(_ttl_caches.items())}
+
+
+def get_audio_cache() -> AudioCache:
+    """Return the disk cache of lesson audio, see `AudioCache`."""
+    global _audio_cache
+    if _audio_cache is None:
+        cfg = get_settings().connection.cache.audio
+        _audio_cache = AudioCache(cfg.directory, cfg.max_bytes, cfg.codec, cfg.bitrate)
+    return _audio_cache
+
+
+def get_audio_cache_stats() -> dict[str, int]:
+    """Files and bytes kept, hits, misses and evictions of the audio cache."""
+    return get_audio_cache().stats()
+
+
+def get_tts_memo() -> TTSMemo:
+    """Return the memo of text-to-speech conversions, see `TTSMemo`."""
+    global _tts_memo
+    if _tts_memo is None:
+        cfg = get_settings().connection.cache.tts
+        _tts_memo = TTSMemo(cfg.directory, cfg.ttl, cfg.max_bytes)
+    return _tts_memo
+
+
+def get_tts_memo_stats() -> dict[str, int | float]:
+    """Files and bytes kept, evictions, hits, misses, shared conversions and
+    hit rate of the TTS memo."""
+    return get_tts_memo().stats()
+
+
+def get_generation_cache() -> DiskCache:
+    """Return the disk cache of generated lesson content, see `DiskCache`."""
+    global _generation_cache
+    if _generation_cache is None:
+        cfg = get_settings().connection.cache.generation
+        _generation_cache = DiskCache("generation", cfg.directory, cfg.max_bytes)
+    return _generation_cache
+
+
+def get_generation_cache_stats() -> dict[str, int]:
+    """Files and bytes kept, hits, misses, bypasses and evictions of the
+    generation cache."""
+    return get_generation_cache().stats()
+
+
+def get_cache_stats() -> dict[str, int]:
+    """Cached entries, 304 revalidations, full refreshes and stale results served."""
+    return get_response_cache().stats()
+
+
+def get_breaker_stats() -> dict[str, Any]:
+    """Circuit state per endpoint group."""
+    return {group: b.stats() for group, b in list(_breakers.items())}
+
+
+def get_bulkhead_stats() -> dict[str, Any]:
+    """Limit, active and queued calls, rejections and worst wait per group."""
+    return {group: b.stats() for group, b in list(_bulkheads.items())}
+
+
+get_compression_stats = compression.get_compression_stats
+
+
+def get_single_flight_stats() -> dict[str, int]:
+    """Upstream GETs issued and callers that joined one already in flight."""
+    return dict(_single_flight_stats)
+
+
+def close_httpx_client():
+    global _client, _async_client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+    loop = _loop
+    if loop is not None and loop.is_running():
+        if _async_client is not None:
+            asyncio.run_coroutine_threadsafe(_async_client.aclose(), loop).result(5)
+            _async_client = None
+        loop.call_soon_threadsafe(loop.stop)
+
+
+atexit.register(close_httpx_client)
+
+
+def _pool_stats(client: httpx.Client | httpx.AsyncClient | None) -> dict[str, int]:
+    stats = {"connections": 0, "idle": 0, "active": 0, "queued": 0}
+    if client is None or client.is_closed:
+        return stats
+    pool = getattr(client._transport, "_pool", None)
+    if pool is None:
+        return stats
+    connections = list(pool.connections)
+    stats["connections"] = len(connections)
+    stats["idle"] = sum(1 for c in connections if c.is_idle())
+    stats["active"] = stats["connections"] - stats["idle"]
+    stats["queued"] = sum(1 for r in list(pool._requests) if r.is_queued())
+    return stats
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """Snapshot of the shared connection pools.
+
+    Returns:
+        dict[str, Any]: open/idle/active connection counts and requests waiting
+        for a connection for the sync and async clients, plus the total number
+        of requests sent.
+    """
+    return {
+        "sync": _pool_stats(_client),
+        "async": _pool_stats(_async_client),
+        "requests_sent": _requests_sent,
+    }
+
+
+def build_url(path: str):
+    """A backend URL for `path`, below the base path of the configured URL.
+    Prefer `get_endpoint(...).url()` for the routes in `utils.endpoints`."""
+    return base_url() + path.lstrip("/")
 
 
 def build_audio_url(audio_url: str) -> str:
     if audio_url.startswith("http"):
         return audio_url
     else:
-        return build_url(f"resources/v1/audio/{audio_url}")
+        return get_endpoint("audio.get").url(uid=audio_url)
@@ -0,0 +1,143 @@
+"""Regex matching with a hard deadline.
+
+Python's `re` cannot be interrupted and holds the GIL while it backtracks, so
+a pathological pattern cannot be stopped from a thread. Patterns are matched
+in worker processes instead, each killed (and replaced) when it runs out of
+time. A few workers serve all sessions, one search at a time each; waiting
+for a free one counts against the budget. Workers keep the last columns they
+were sent, so a column crosses to a worker once, not on every search. The
+module is kept free of heavy imports, so workers start quickly.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import itertools
+import multiprocessing
+import queue
+import re
+import threading
+import time
+
+# Worker processes, and the columns each keeps.
+WORKERS = 2
+COLUMNS = 8
+
+_tokens = itertools.count()
+_idle: queue.Queue[_Worker] | None = None
+_lock = threading.Lock()
+
+
+def search_rows(pattern: str, flags: int, rows: list[str | None]) -> list[bool]:
+    """Whether `pattern` is found in each row; missing rows never match."""
+    compiled = re.compile(pattern, flags)
+    return [row is not None and compiled.search(row) is not None for row in rows]
+
+
+class Column:
+    """Rows to search, sent to each worker once: build one per column and
+    search it again and again."""
+
+    __slots__ = ("token", "rows")
+
+    def __init__(self, rows: list[str | None]):
+        self.token = next(_tokens)
+        self.rows = rows
+
+
+def _serve(conn):
+    columns: OrderedDict[int, list[str | None]] = OrderedDict()
+    conn.send("ready")
+    while True:
+        try:
+            token, pattern, flags, rows = conn.recv()
+        except EOFError:
+            return
+        if rows is not None:
+            columns[token] = rows
+            while len(columns) > COLUMNS:
+                columns.popitem(last=False)
+        rows = columns.get(token)
+        if rows is None:
+            conn.send(None)  # not kept (any more): send it
+            continue
+        columns.move_to_end(token)
+        conn.send(search_rows(pattern, flags, rows))
+
+
+class _Worker:
+    """A worker process, used by one caller at a time. Starting one waits
+    for it to be up."""
+
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self._conn, child = context.Pipe()
+        self._process = context.Process(target=_serve, args=(child,), daemon=True)
+        self._process.start()
+        child.close()
+        self._conn.recv()
+        # The columns the worker keeps, least recently used first.
+        self._columns: OrderedDict[int, None] = OrderedDict()
+
+    def search(
+        self, pattern: re.Pattern, column: Column, deadline: float
+    ) -> list[bool]:
+        rows = None if column.token in self._columns else column.rows
+        while True:
+            self._conn.send((column.token, pattern.pattern, pattern.flags, rows))
+            if not self._conn.poll(max(deadline - time.monotonic(), 0.0)):
+                raise TimeoutError(f"Searching for {pattern.pattern!r} took too long")
+            found = self._conn.recv()
+            if found is not None:
+                break
+            rows = column.rows
+        self._columns[column.token] = None
+        self._columns.move_to_end(column.token)
+        while len(self._columns) > COLUMNS:
+            self._columns.popitem(last=False)
+        return found
+
+    def stop(self):
+        self._process.kill()
+        self._process.join()
+        self._conn.close()
+
+
+def _get_idle() -> queue.Queue[_Worker]:
+    global _idle
+    with _lock:
+        if _idle is None:
+            idle: queue.Queue[_Worker] = queue.Queue()
+            for _ in range(WORKERS):
+                idle.put(_Worker())
+            _idle = idle
+    return _idle
+
+
+def search_with_deadline(
+    pattern: re.Pattern, column: Column, budget: float
+) -> list[bool]:
+    """`search_rows` in a worker process, given at most `budget` seconds,
+    waiting for a free worker included.
+
+    Raises:
+        TimeoutError: no worker was free in time, or the search took longer;
+            the worker was then stopped and replaced.
+    """
+    idle = _get_idle()
+    deadline = time.monotonic() + budget
+    try:
+        worker = idle.get(timeout=budget)
+    except queue.Empty:
+        raise TimeoutError(
+            f"No worker was free to search for {pattern.pattern!r}"
+        ) from None
+    try:
+        return worker.search(pattern, column, deadline)
+    except TimeoutError:
+        # The search cannot be interrupted; its caller starts the next worker.
+        worker.stop()
+        worker = _Worker()
+        raise
+    finally:
+        idle.put(worker)
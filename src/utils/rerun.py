@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable, Hashable
+import contextvars
+import threading
+from typing import Any, TypeVar
+import weakref
+
+import logfire
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from settings import get_settings
+
+T = TypeVar("T")
+
+
+class RerunCallsError(Exception):
+    """A script run made more backend calls than allowed, or repeated one.
+
+    Deliberately not a `RuntimeError`, which pages catch as a failed call.
+    """
+
+
+class RerunScope:
+    """
+    Backend calls made by one script run of one session.
+
+    Holds the results of memoized lookups, so identical idempotent calls in
+    the same run are made once, and counts the requests actually sent, to
+    flag runs that make too many or repeat one (N+1 patterns).
+    """
+
+    def __init__(self, marker: object):
+        self.marker = marker
+        self.results: dict[Hashable, Any] = {}
+        self.requests: Counter[tuple[str, str]] = Counter()
+        self.violations: list[str] = []
+        self.memo_hits = 0
+        self._lock = threading.Lock()
+
+    def note_request(self, method: str, url: str):
+        cfg = get_settings().connection.rerun
+        with self._lock:
+            key = (method.upper(), url)
+            self.requests[key] += 1
+            total = self.requests.total()
+            if cfg.check == "off":
+                return
+            problems = []
+            if self.requests[key] == 2:
+                problems.append(f"{method} {url} sent more than once in one rerun")
+            if total == cfg.max_calls + 1:
+                problems.append(
+                    f"more than {cfg.max_calls} backend calls in one rerun, "
+                    f"latest {method} {url}"
+                )
+        for problem in problems:
+            logfire.warn("Rerun check: {problem}", problem=problem)
+        self.violations += problems
+
+    def check(self):
+        """Raise the violations found so far when checks are set to `raise`."""
+        if self.violations and get_settings().connection.rerun.check == "raise":
+            violations, self.violations = self.violations, []
+            raise RerunCallsError("; ".join(violations))
+
+
+# By id of the run context; the context is unhashable. Entries go with it.
+_scopes: dict[int, RerunScope] = {}
+_scopes_lock = threading.Lock()
+active_scope: contextvars.ContextVar[RerunScope | None] = contextvars.ContextVar(
+    "active_scope", default=None
+)
+
+
+def current_scope() -> RerunScope | None:
+    """The scope of the script run on the calling thread, or None outside one.
+
+    Streamlit replaces the run context's cursors at the start of each run
+    (reruns, page switches and fragment reruns alike), which is what tells
+    one run of a session from the next.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    with _scopes_lock:
+        scope = _scopes.get(id(ctx))
+        if scope is None:
+            weakref.finalize(ctx, _scopes.pop, id(ctx), None)
+        if scope is None or scope.marker is not ctx.cursors:
+            scope = _scopes[id(ctx)] = RerunScope(ctx.cursors)
+    return scope
+
+
+def note_request(method: str, url: str):
+    """Count a request against the script run that caused it, if any."""
+    scope = active_scope.get()
+    if scope is not None:
+        scope.note_request(method, url)
+
+
+def memoized(key: Hashable, compute: Callable[[], T]) -> T:
+    """Return `compute()`, computed once per script run for each `key`.
+
+    For idempotent lookups only: a page asking for the same thing twice in a
+    run gets the first answer. Outside a script run, or with
+    `Settings.connection.rerun.memo` off, it is always computed.
+    """
+    scope = current_scope() if get_settings().connection.rerun.memo else None
+    if scope is None:
+        return compute()
+    if key in scope.results:
+        scope.memo_hits += 1
+        return scope.results[key]
+    result = scope.results[key] = compute()
+    return result
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+import math
+import random
+import time
+from typing import Any, TypeVar
+
+import logfire
+
+T = TypeVar("T")
+
+_lookups = logfire.metric_counter(
+    "backend.ttl_cache.lookups",
+    description="Reads of a TTL cache, by cache and outcome (hit, stale, miss)",
+)
+_age = logfire.metric_histogram(
+    "backend.ttl_cache.age",
+    unit="s",
+    description="Age of the values served from a TTL cache",
+)
+
+
+@dataclass(slots=True)
+class TTLEntry:
+    value: Any
+    fetched_at: float
+    fetch_seconds: float
+
+
+class TTLCache:
+    """
+    Time-based cache that keeps serving a value while it is refreshed.
+
+    A value is fresh for `ttl` seconds. For `stale_for` seconds after that it
+    is still returned at once while a single background refresh replaces it.
+    Older or missing values are fetched while the caller waits, with
+    concurrent callers sharing the fetch.
+
+    So that sessions do not all miss at the moment a popular value expires,
+    a read of a fresh value may start the refresh early, with a probability
+    that grows as expiry nears and with how long the last fetch took
+    (probabilistic early expiration, "XFetch"). `beta` scales how early;
+    0 disables it. Values past serving are dropped as new ones are stored.
+    Must be used from the network event loop.
+
+    Args:
+        name (str): Cache name, used as the metric attribute.
+        ttl (float): Seconds a value is fresh.
+        stale_for (float): Seconds past `ttl` a value may still be served.
+        beta (float): Early refresh factor.
+    """
+
+    def __init__(
+        self, name: str, ttl: float, stale_for: float = 0.0, beta: float = 1.0
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.stale_for = stale_for
+        self.beta = beta
+        self._entries: dict[Hashable, TTLEntry] = {}
+        self._refreshing: dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self._random = random.Random()
+        self._stats = {
+            "hit": 0,
+            "stale": 0,
+            "miss": 0,
+            "early_refreshes": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "invalidations": 0,
+        }
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Return the cached value of `key`, calling `fetch` to (re)load it."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl:
+                if self._expires_early(entry, age):
+                    self._stats["early_refreshes"] += 1
+                    self._refresh(key, fetch)
+                self._record("hit", age)
+                return entry.value
+            if age < self.ttl + self.stale_for:
+                self._refresh(key, fetch)
+                self._record("stale", age)
+                return entry.value
+        self._record("miss", 0.0)
+        return await asyncio.shield(self._refresh(key, fetch))
+
+    def invalidate(self, key: Hashable | None = None):
+        """Forget `key` (every key by default), including refreshes in flight,
+        so the next read fetches anew."""
+        self._generation += 1
+        self._stats["invalidations"] += 1
+        if key is None:
+            self._entries.clear()
+            self._refreshing.clear()
+        else:
+            self._entries.pop(key, None)
+            self._refreshing.pop(key, None)
+
+    def _expires_early(self, entry: TTLEntry, age: float) -> bool:
+        if not self.beta:
+            return False
+        gap = -math.log(1.0 - self._random.random())
+        return age + entry.fetch_seconds * self.beta * gap >= self.ttl
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, fetch, self._generation))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda t: self._loaded(key, t))
+        return task
+
+    async def _load(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]], generation: int
+    ):
+        start = time.monotonic()
+        value = await fetch()
+        now = time.monotonic()
+        # A value fetched before an invalidation must not replace it.
+        if generation == self._generation:
+            self._entries[key] = TTLEntry(value, now, now - start)
+            self._prune(now)
+        self._stats["refreshes"] += 1
+        return value
+
+    def _prune(self, now: float):
+        limit = self.ttl + self.stale_for
+        for key, entry in list(self._entries.items()):
+            if now - entry.fetched_at >= limit:
+                del self._entries[key]
+
+    def _loaded(self, key: Hashable, task: asyncio.Future):
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+        if not task.cancelled() and task.exception() is not None:
+            self._stats["refresh_failures"] += 1
+            logfire.warn(
+                "Refreshing {cache} cache failed",
+                cache=self.name,
+                _exc_info=task.exception(),
+            )
+
+    def _record(self, outcome: str, age: float):
+        self._stats[outcome] += 1
+        _lookups.add(1, {"cache": self.name, "outcome": outcome})
+        if outcome != "miss":
+            _age.record(age, {"cache": self.name})
+
+    def stats(self) -> dict[str, int | float]:
+        now = time.monotonic()
+        ages = [now - e.fetched_at for e in list(self._entries.values())]
+        return {
+            "entries": len(ages),
+            **self._stats,
+            "max_age": max(ages, default=0.0),
+        }
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+import hashlib
+import json
+from pathlib import Path
+import re
+import time
+from typing import Any
+import unicodedata
+
+import logfire
+
+from .diskstore import DiskStore, InFlight
+
+_lookups = logfire.metric_counter(
+    "backend.tts_memo.lookups",
+    description="Text-to-speech conversions looked up in the memo, by outcome",
+)
+
+
+def normalize_transcript(text: str) -> str:
+    """The text as the speech engine hears it: NFC, runs of whitespace
+    collapsed, no leading or trailing space. Case is kept, it can change how
+    abbreviations are read."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def memo_key(transcript: str, params: dict[str, Any]) -> str:
+    """SHA-256 of the normalized transcript and the conversion parameters
+    (voice, format, ...)."""
+    data = json.dumps(
+        [normalize_transcript(transcript), params],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _name(key: str) -> str:
+    return f"{key[:2]}/{key}.json"
+
+
+class TTSMemo:
+    """
+    Text-to-speech results (audio uids) by transcript, kept on disk.
+
+    One small file per conversion, named by `memo_key`, so every session and
+    every server process sharing `directory` reuses a conversion any of them
+    made. Entries older than `ttl` seconds are converted again, in case the
+    backend has dropped the audio. Files are kept in a `DiskStore`, which
+    deletes the least recently used past `max_bytes`.
+    Concurrent conversions of the same text in a process share one backend
+    call. Must be used from the network event loop.
+
+    Args:
+        directory (Path): Where the entries are kept.
+        ttl (float): Seconds an entry is reused.
+        max_bytes (int): Byte budget of the entries.
+    """
+
+    def __init__(self, directory: Path, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self._store = DiskStore(directory, max_bytes)
+        self._converting: InFlight[str] = InFlight()
+        self._stats = {"hit": 0, "miss": 0, "shared": 0}
+
+    async def get(
+        self,
+        transcript: str,
+        params: dict[str, Any],
+        convert: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Return the uid of `transcript` spoken with `params`, calling
+        `convert` only if no fresh conversion of it is known."""
+        key = memo_key(transcript, params)
+        if key not in self._converting:
+            uid = await self._read(key)
+            if uid is not None:
+                self._record("hit")
+                return uid
+        self._record("shared" if key in self._converting else "miss")
+        return await self._converting.run(key, lambda: self._convert(key, convert))
+
+    async def _convert(self, key: str, convert: Callable[[], Awaitable[str]]) -> str:
+        uid = await convert()
+        entry = {"uid": uid, "created": time.time()}
+        await self._store.write(_name(key), json.dumps(entry).encode())
+        return uid
+
+    async def _read(self, key: str) -> str | None:
+        data = await self._store.read(_name(key))
+        if data is None:
+            return None
+        try:
+            entry = json.loads(data)
+        except ValueError:
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl:
+            return None
+        return entry.get("uid")
+
+    def _record(self, outcome: str):
+        self._stats[outcome] += 1
+        _lookups.add(1, {"outcome": outcome})
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = sum(self._stats.values())
+        reused = self._stats["hit"] + self._stats["shared"]
+        return {
+            **self._store.stats(),
+            **self._stats,
+            "hit_rate": reused / lookups if lookups else 0.0,
+        }
@@ -74,6 +74,22 @@ def normalize_text(text: str) -> str:
     return unicodedata.normalize("NFC", text).lower()
 
 
+def fold_accents(text: str) -> str:
+    """
+    Normalize a text with `normalize_text`, then drop its diacritics, so that
+    "Tiếng Việt", "tieng viet" and "TIENG VIET" compare equal.
+
+    Parameters:
+    text (str): The input text to be folded.
+
+    Returns:
+    str: The normalized text, lowercase, without diacritics ("đ" becomes "d").
+    """
+    decomposed = unicodedata.normalize("NFD", normalize_text(text))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return unicodedata.normalize("NFC", stripped).replace("đ", "d")
+
+
 def is_valid_url(url: str) -> bool:
     """
     Validates if a given string is a properly formatted URL.
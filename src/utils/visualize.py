@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from functools import lru_cache
 import math
-from typing import List
+import re
+import threading
+from typing import Any, Callable, Hashable, List
+import weakref
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
 
-from .validate import normalize_text
+from .regexworker import Column, search_with_deadline
 
 
 def split_frame(df: pd.DataFrame, batch_size: int) -> List[pd.DataFrame]:
@@ -23,7 +31,137 @@ def split_frame(df: pd.DataFrame, batch_size: int) -> List[pd.DataFrame]:
     return [df[i : i + batch_size] for i in range(0, len(df), batch_size)]
 
 
-def filter_dataframe(df: pd.DataFrame, user_session: dict) -> pd.DataFrame:
+# Seconds a filter may spend on a regex RE2 cannot run (lookarounds,
+# backreferences), which Python's backtracking engine then matches in a
+# worker process (`utils.regexworker`).
+REGEX_BUDGET = 0.5
+_REGEX_CHARS = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+# What is derived from a frame (normalized text, Arrow table), by id of the
+# frame; frames are unhashable. Entries go with the frame, which must not be
+# changed in place.
+_derived: dict[int, tuple[tuple, dict[Any, Any]]] = {}
+# The same, by a key the caller gives, for frames rebuilt on every rerun:
+# hashing their content would cost more than deriving again. The most recent
+# DERIVED_KEYS are kept.
+DERIVED_KEYS = 16
+_derived_by_key: OrderedDict[Hashable, tuple[tuple, dict[Any, Any]]] = OrderedDict()
+_derived_lock = threading.Lock()
+
+
+def _derived_from(df: pd.DataFrame, key: Hashable | None = None) -> dict[Any, Any]:
+    fingerprint = (df.shape, tuple(df.columns))
+    if key is not None:
+        with _derived_lock:
+            entry = _derived_by_key.get(key)
+            if entry is None or entry[0] != fingerprint:
+                entry = _derived_by_key[key] = (fingerprint, {})
+            _derived_by_key.move_to_end(key)
+            while len(_derived_by_key) > DERIVED_KEYS:
+                _derived_by_key.popitem(last=False)
+        return entry[1]
+    entry = _derived.get(id(df))
+    if entry is None:
+        weakref.finalize(df, _derived.pop, id(df), None)
+    if entry is None or entry[0] != fingerprint:
+        entry = _derived[id(df)] = (fingerprint, {})
+    return entry[1]
+
+
+def _normalize(values: pa.Array) -> pa.Array:
+    # `normalize_text`, vectorized.
+    return pc.utf8_lower(pc.utf8_normalize(values, form="NFC"))
+
+
+def shadow_column(
+    df: pd.DataFrame, column: str, key: Hashable | None = None
+) -> pa.Array:
+    """
+    The text of a column as filters compare it: NFC, lowercase, with
+    missing values null.
+
+    Built once per frame and column, so a frame kept across reruns (in the
+    session state, or a cached resource) is normalized once. A frame rebuilt
+    on each rerun is normalized once per `key` instead; see `apply_filters`.
+    """
+    derived = _derived_from(df, key)
+    key = ("shadow", column)
+    if key not in derived:
+        values = df[column]
+        # `astype(str)` would turn missing values into "nan" or "None", which
+        # filters could match; they are kept null and match nothing.
+        text = pa.array(values.astype(str), type=pa.large_string())
+        missing = pa.array(values.isna().to_numpy())
+        derived[key] = _normalize(pc.if_else(missing, None, text))
+    return derived[key]
+
+
+# Shadow columns as regex workers take them, by id of the column, so each
+# column is sent to a worker once. Entries go with the column.
+_worker_columns: dict[int, Column] = {}
+
+
+def _worker_column(values: pa.Array) -> Column:
+    column = _worker_columns.get(id(values))
+    if column is None:
+        column = _worker_columns[id(values)] = Column(values.to_pylist())
+        weakref.finalize(values, _worker_columns.pop, id(values), None)
+    return column
+
+
+@lru_cache(maxsize=256)
+def compile_filter(term: str) -> tuple[str, str | re.Pattern]:
+    """
+    How a search term is matched: `literal` (a plain substring), `re2` (a
+    regex pyarrow runs in linear time) or `python` (a regex only Python's
+    `re` supports). A term that is not a valid regex is taken literally.
+
+    Regexes are matched ignoring case rather than lowercased, which would
+    turn classes like `\\D` or `\\S` into their opposites.
+    """
+    text = pa.array([term], type=pa.large_string())
+    literal = _normalize(text)[0].as_py()
+    if not _REGEX_CHARS.search(term):
+        return "literal", literal
+    term = pc.utf8_normalize(text, form="NFC")[0].as_py()
+    try:
+        pattern = re.compile(term, re.IGNORECASE)
+    except re.error:
+        return "literal", literal
+    try:
+        pc.match_substring_regex(
+            pa.array([""], type=pa.large_string()), term, ignore_case=True
+        )
+    except pa.ArrowInvalid:
+        return "python", pattern
+    return "re2", term
+
+
+def match_column(
+    values: pa.Array, term: str, budget: float = REGEX_BUDGET
+) -> np.ndarray:
+    """
+    Which of the normalized `values` contain `term`, as a boolean array.
+
+    Raises:
+        TimeoutError: a regex only Python supports took longer than `budget`
+            seconds, waiting for a worker included; it is matched in a
+            worker process, stopped when the time is up.
+    """
+    kind, pattern = compile_filter(term)
+    if kind == "literal":
+        mask = pc.match_substring(values, pattern)
+    elif kind == "re2":
+        mask = pc.match_substring_regex(values, pattern, ignore_case=True)
+    else:
+        found = search_with_deadline(pattern, _worker_column(values), budget)
+        return np.array(found, dtype=bool)
+    return pc.fill_null(mask, False).to_numpy(zero_copy_only=False)
+
+
+def filter_dataframe(
+    df: pd.DataFrame, user_session: dict, key: Hashable | None = None
+) -> pd.DataFrame:
     """
     Filter a DataFrame based on user-selected columns and search criteria.
 
@@ -31,7 +169,10 @@ def filter_dataframe(df: pd.DataFrame, user_session: dict) -> pd.DataFrame:
     and enter search terms. It then filters the DataFrame based on these inputs.
 
     Args:
-        df (pd.DataFrame): The input DataFrame to be filtered.
+        df (pd.DataFrame): The input DataFrame to be filtered. Pass the same
+            frame on each rerun, so its text is normalized once.
+        key (Hashable, optional): Names the data of a frame rebuilt on each
+            rerun; see `apply_filters`. Defaults to None.
 
     Returns:
         pd.DataFrame: A filtered version of the input DataFrame based on user inputs.
@@ -40,12 +181,10 @@ def filter_dataframe(df: pd.DataFrame, user_session: dict) -> pd.DataFrame:
         This function uses Streamlit for creating the interactive interface and
         stores filter states in Streamlit's session state.
     """
-    df = df.copy()
-
-    # normalize_text
-    for col in df.columns:
-        if df[col].dtype == object:
-            df[col] = df[col].astype(str)
+    # Object or string columns, by dtype (without looking at the values).
+    text_columns = [
+        col for col in df.columns if pd.api.types.is_string_dtype(df[col].dtype)
+    ]
 
     with st.expander("🔍 **Advanced filter**", expanded=True):
         col_input, _ = st.columns([1, 1])
@@ -57,7 +196,7 @@ def filter_dataframe(df: pd.DataFrame, user_session: dict) -> pd.DataFrame:
         for column in to_filter_columns:
             col_input, _ = st.columns([1, 1])
             with col_input:
-                if df[column].dtype == object:
+                if column in text_columns:
                     user_session["filters"][column] = st.text_input(
                         f"🔠 Search in **{column}** (Regex is supported)",
                         value=user_session["filters"].get(column, ""),
@@ -72,36 +211,101 @@ def filter_dataframe(df: pd.DataFrame, user_session: dict) -> pd.DataFrame:
 
     # View result after search
     if user_session.get("search_clicked", False):
-        for column, value in user_session["filters"].items():
-            if isinstance(value, str) and value:
-                df = df[
-                    df[column]
-                    .astype(str)
-                    .apply(normalize_text)
-                    .str.contains(normalize_text(value), na=False)
-                ]
+        try:
+            df = apply_filters(df, user_session["filters"], key=key)
+        except TimeoutError as e:
+            st.warning(f"⚠️ {e}. Try a simpler pattern.")
 
     return df
 
 
+def apply_filters(
+    df: pd.DataFrame,
+    filters: dict[str, str],
+    budget: float = REGEX_BUDGET,
+    key: Hashable | None = None,
+) -> pd.DataFrame:
+    """
+    Keep the rows whose columns match every search term.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to filter.
+        filters (dict[str, str]): Search term (a regex) per column; empty
+            terms are ignored. Terms without regex syntax are matched as
+            plain text, faster.
+        budget (float): Seconds each regex only Python supports may take.
+        key (Hashable, optional): Names the data of `df`, e.g. the caller and
+            a version bumped when the data changes, so its normalized text
+            is reused when the frame is rebuilt with the same data. Without
+            it, the text is reused only for the same frame object.
+
+    Returns:
+        pd.DataFrame: The matching rows.
+
+    Raises:
+        TimeoutError: a regex took longer than `budget`.
+    """
+    mask = None
+    for column, value in filters.items():
+        if isinstance(value, str) and value:
+            matches = match_column(shadow_column(df, column, key), value, budget)
+            mask = matches if mask is None else mask & matches
+    return df if mask is None else df[mask]
+
+
+# (offset, limit) -> (the rows, number of rows in all)
+PageSource = Callable[[int, int], tuple[pd.DataFrame | pa.Table, int]]
+
+
+def frame_slice(df: pd.DataFrame, offset: int, limit: int) -> pa.Table | pd.DataFrame:
+    """
+    Rows `offset` to `offset + limit` of a frame, as an Arrow table.
+
+    Only the page is converted, so the cost follows the page size rather than
+    the frame's, and nothing is kept between reruns. Pages Arrow cannot hold
+    (columns of mixed types) are returned as frames.
+    """
+    page = df.iloc[offset : offset + limit]
+    try:
+        return pa.Table.from_pandas(page, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return page
+
+
+def _first_page(key: str):
+    st.session_state[key] = 1
+
+
 def paginate_df(
-    name: str, dataset, streamlit_object: str, disabled=None, num_rows=None
+    name: str,
+    dataset,
+    streamlit_object: str,
+    disabled=None,
+    num_rows=None,
+    source: PageSource | None = None,
 ):
     """
     Create a paginated display of a dataset using Streamlit components.
 
     This function provides an interactive interface for viewing and sorting a dataset,
-    with options for pagination and sorting.
+    with options for pagination and sorting. Only the page shown is sliced
+    from the dataset, or fetched from `source`.
 
     Args:
-        name (str): A unique identifier for the Streamlit components.
+        name (str): A unique identifier for the Streamlit components. The page
+            size and page number of each table are kept under it, across
+            reruns.
         dataset: The dataset to be displayed (expected to be a pandas DataFrame).
+            Ignored when `source` is given.
         streamlit_object (str): The type of Streamlit object to use for display.
             Can be either 'df' for a regular dataframe or 'editable df' for an editable one.
         disabled (list, optional): A list of columns to be disabled in the editable dataframe.
             Only used when streamlit_object is 'editable df'. Defaults to None.
         num_rows (int, optional): The number of rows to display in the editable dataframe.
             Only used when streamlit_object is 'editable df'. Defaults to None.
+        source (PageSource, optional): Fetches a page, e.g. from the backend,
+            given its offset and size, and returns it with the number of rows
+            in all. Defaults to None.
 
     Returns:
         None: This function doesn't return a value, it displays the paginated dataset
@@ -111,46 +315,61 @@ def paginate_df(
         This function uses various Streamlit components (st.warning, st.expander, st.columns, etc.)
         and assumes that the 'st' object is available in the global namespace.
     """
-    if dataset.empty:
-        st.warning("⚠️ No data to display.")
-        return
+    size_key, page_key = f"{name}_page_size", f"{name}_page"
+    batch_size = st.session_state.get(size_key, 10)
+    current_page = st.session_state.get(page_key, 1)
+
+    if source is None:
+        if dataset.empty:
+            st.warning("⚠️ No data to display.")
+            return
+        total = len(dataset)
+    else:
+        page, total = source((current_page - 1) * batch_size, batch_size)
+        if total == 0:
+            st.warning("⚠️ No data to display.")
+            return
+
+    total_pages = max(math.ceil(total / batch_size), 1)
+    if current_page > total_pages:
+        # The dataset shrank under the page shown; show its last page.
+        current_page = st.session_state[page_key] = total_pages
+        if source is not None:
+            page, _ = source((current_page - 1) * batch_size, batch_size)
+    if source is None:
+        page = frame_slice(dataset, (current_page - 1) * batch_size, batch_size)
 
     pagination = st.container()
     bottom_menu = st.columns((4, 1, 1))
 
     with bottom_menu[2]:
-        batch_size = st.selectbox(
-            "📏 **Page sizes**", options=[10, 25, 50, 100], key=f"{name}"
+        st.selectbox(
+            "📏 **Page sizes**",
+            options=[10, 25, 50, 100],
+            key=size_key,
+            on_change=_first_page,
+            args=(page_key,),
         )
 
-    total_pages = max(math.ceil(len(dataset) / batch_size), 1)
-
     with bottom_menu[1]:
-        current_page = st.number_input(
+        st.number_input(
             "📌 **Page**",
             min_value=1,
             max_value=total_pages,
             step=1,
-            value=1,
+            key=page_key,
         )
 
     with bottom_menu[0]:
         st.markdown(f"📖 Page **{current_page}** on **{total_pages}** ")
 
-    pages = split_frame(dataset, batch_size)
-
-    if current_page <= len(pages):
-        if streamlit_object == "df":
-            pagination.dataframe(
-                pages[current_page - 1], hide_index=True, use_container_width=True
-            )
-        elif streamlit_object == "editable df":
-            pagination.data_editor(
-                pages[current_page - 1],
-                hide_index=True,
-                disabled=False if disabled is None else disabled,
-                num_rows=num_rows,  # type: ignore
-                use_container_width=True,
-            )  # type: ignore
-    else:
-        st.warning("⚠️ Page number exceeds the valid range.")
+    if streamlit_object == "df":
+        pagination.dataframe(page, hide_index=True, use_container_width=True)
+    elif streamlit_object == "editable df":
+        pagination.data_editor(
+            page,
+            hide_index=True,
+            disabled=False if disabled is None else disabled,
+            num_rows=num_rows,  # type: ignore
+            use_container_width=True,
+        )  # type: ignore